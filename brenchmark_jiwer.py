@@ -4,12 +4,26 @@ import jiwer
 import opencc 
 import logging
 import csv
+import multiprocessing
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
 
 DETAILED_LOG_FILE = "stt_evaluation_details.log"
 SUMMARY_REPORT_FILE = "stt_summary_report.csv"
 HYPOTHESIS_FILE_EXTENSION = ".txt"
 GROUND_TRUTH_EXTENSION = ".vtt"
+PUNCTUATION_CHARS = (
+    r"""＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏﹑﹔·！？｡。"""
+    r"""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""
+)
+PUNCTUATION_DELETE_TABLE = str.maketrans('', '', PUNCTUATION_CHARS)
+VTT_TAG_REGEX = re.compile(r'<[^>]+>')
+TXT_HEADER_PREFIXES = ("Detected language", "TRANSCRIPTION:", "UTTERANCE ")
+PAIR_BATCH_SIZE = 16
+OPENCC_BATCH_SEPARATOR = "\x1f"
+OPENCC_CACHE_MAX_LENGTH = 256
 
 def setup_logger():
     """Configures the logger to write to a file and console."""
@@ -29,7 +43,13 @@ def setup_logger():
     logger.addHandler(ch)
     return logger
 
-logger = setup_logger()
+# Spawned workers re-import this module before parent_process() is set, so match on
+# the process name; only the main process owns the handlers, otherwise each
+# spawned worker would truncate the detailed log.
+if multiprocessing.current_process().name == "MainProcess":
+    logger = setup_logger()
+else:
+    logger = logging.getLogger('STT_Evaluation')
 
 
 try:
@@ -42,48 +62,25 @@ except Exception as e:
 
 
 def read_vtt_file(file_path):
-    lines = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line == "WEBVTT" or "-->" in line or not line:
-                    continue
-                line = re.sub(r'<[^>]+>', '', line)
-                lines.append(line)
-    except Exception as e:
-        logger.error(f"Error reading VTT file {file_path}: {e}")
-        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stripped_lines = [line.strip() for line in f.read().split('\n')]
+    lines = [VTT_TAG_REGEX.sub('', line) for line in stripped_lines
+             if line and line != "WEBVTT" and "-->" not in line]
     return " ".join(lines)
 
 def read_txt_file(file_path):
-    transcription_lines = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("Detected language") or \
-                   line.startswith("TRANSCRIPTION:") or \
-                   line.startswith("UTTERANCE "):
-                    continue
-                if line:
-                    transcription_lines.append(line)
-    except Exception as e:
-        logger.error(f"Error reading TXT file {file_path}: {e}")
-        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stripped_lines = [line.strip() for line in f.read().split('\n')]
+    transcription_lines = [line for line in stripped_lines
+                           if line and not line.startswith(TXT_HEADER_PREFIXES)]
     return " ".join(transcription_lines)
 
 def preprocess_text(text, convert_to_traditional=False):
     if not text:
         return ""
     if convert_to_traditional and s2t_converter:
-        text = s2t_converter.convert(text)
-    punctuation = (
-        r"""＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏﹑﹔·！？｡。"""
-        r"""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""
-    )
-    text = re.sub(f"[{re.escape(punctuation)}]", "", text)
-    text = re.sub(r'\s+', '', text)
+        text = convert_text_to_traditional(text)
+    text = "".join(text.translate(PUNCTUATION_DELETE_TABLE).split())
     text = text.lower()
     return text
 
@@ -91,12 +88,13 @@ def calculate_stt_metrics(ground_truth, hypothesis):
     if not ground_truth and not hypothesis: wer, cer = 0.0, 0.0
     elif not ground_truth: wer, cer = 1.0, 1.0
     elif not hypothesis: wer, cer = 1.0, 1.0
+    elif ground_truth == hypothesis: wer, cer = 0.0, 0.0
     else:
-        try: wer = jiwer.wer(ground_truth, hypothesis)
+        try: wer = jiwer.process_words(ground_truth, hypothesis).wer
         except Exception as e:
             logger.debug(f"JiWER WER calculation error: {e}. GT='{ground_truth}', HYP='{hypothesis}'")
             wer = 1.0
-        try: cer = jiwer.cer(ground_truth, hypothesis)
+        try: cer = jiwer.process_characters(ground_truth, hypothesis).cer
         except Exception as e:
             logger.debug(f"JiWER CER calculation error: {e}. GT='{ground_truth}', HYP='{hypothesis}'")
             cer = 1.0
@@ -104,8 +102,59 @@ def calculate_stt_metrics(ground_truth, hypothesis):
     return {"WER": wer, "WRR": wrr, "CER": cer}
 
 
+@lru_cache(maxsize=65536)
+def convert_short_text(text):
+    return s2t_converter.convert(text)
+
+def convert_text_to_traditional(text):
+    if len(text) <= OPENCC_CACHE_MAX_LENGTH:
+        return convert_short_text(text)
+    return s2t_converter.convert(text)
+
+def convert_to_traditional_bulk(texts):
+    """Converts short texts through the LRU cache and all longer ones with a single joined OpenCC call."""
+    if not s2t_converter or not texts:
+        return list(texts)
+    converted = [convert_short_text(text) if len(text) <= OPENCC_CACHE_MAX_LENGTH else None for text in texts]
+    long_indices = [i for i, text in enumerate(converted) if text is None]
+    if long_indices:
+        long_texts = [texts[i] for i in long_indices]
+        long_converted = s2t_converter.convert(OPENCC_BATCH_SEPARATOR.join(long_texts)).split(OPENCC_BATCH_SEPARATOR)
+        if len(long_converted) != len(long_texts):
+            long_converted = [s2t_converter.convert(text) for text in long_texts]
+        for i, text in zip(long_indices, long_converted):
+            converted[i] = text
+    return converted
+
+def read_file_pair(task):
+    gt_path, hyp_path, method_name = task
+    result = {"method": method_name, "gt_file": gt_path, "hyp_file": hyp_path, "errors": []}
+
+    try:
+        result["raw_gt"] = read_vtt_file(gt_path)
+    except Exception as e:
+        result["errors"].append(f"Error reading VTT file {gt_path}: {e}")
+    try:
+        result["raw_hyp"] = read_txt_file(hyp_path)
+    except Exception as e:
+        result["errors"].append(f"Error reading TXT file {hyp_path}: {e}")
+    return result
+
+def process_file_pairs(task_batch):
+    """Reads, normalizes and scores a batch of GT/hypothesis pairs in a worker; errors are returned, not logged."""
+    results = [read_file_pair(task) for task in task_batch]
+    readable_results = [result for result in results if not result["errors"]]
+    converted_hyps = convert_to_traditional_bulk([result.pop("raw_hyp") for result in readable_results])
+
+    for result, converted_hyp in zip(readable_results, converted_hyps):
+        result["processed_gt"] = preprocess_text(result.pop("raw_gt"), convert_to_traditional=False)
+        result["processed_hyp"] = preprocess_text(converted_hyp, convert_to_traditional=False)
+        result["metrics"] = calculate_stt_metrics(result["processed_gt"], result["processed_hyp"])
+    return results
+
+
 def main(root_dir):
-    all_results_data = [] 
+    method_summary = defaultdict(lambda: {"total_wer": 0, "total_wrr": 0, "total_cer": 0, "count": 0})
     file_pairs_found = 0
     files_processed_successfully = 0
 
@@ -114,6 +163,7 @@ def main(root_dir):
     logger.info(f"Detailed logs will be saved to: {DETAILED_LOG_FILE}")
     logger.info(f"Summary report will be saved to: {SUMMARY_REPORT_FILE}")
 
+    tasks = []
     for subdir, _, files in os.walk(root_dir):
         for hyp_file_name in files:
             if not hyp_file_name.endswith(HYPOTHESIS_FILE_EXTENSION):
@@ -135,67 +185,55 @@ def main(root_dir):
                 gt_path = os.path.join(subdir, gt_file_name)
 
             if os.path.exists(gt_path):
-                file_pairs_found += 1
-                logger.info(f"--- Processing Pair {file_pairs_found} (Method: {method_name}) ---")
-                logger.info(f"  GT_File: {gt_path}")
-                logger.info(f"  HYP_File: {hyp_path}")
-
-                raw_gt = read_vtt_file(gt_path)
-                raw_hyp = read_txt_file(hyp_path)
-
-                if raw_gt is None or raw_hyp is None:
-                    logger.warning("  Skipping pair due to read error for one or both files.")
-                    logger.info("--- End Pair Processing ---")
-                    continue
+                tasks.append((gt_path, hyp_path, method_name))
+            else:
                 
-                logger.debug(f"  Raw GT: '{raw_gt[:150]}{'...' if len(raw_gt)>150 else ''}'")
-                logger.debug(f"  Raw HYP: '{raw_hyp[:150]}{'...' if len(raw_hyp)>150 else ''}'")
+                logger.debug(f"Ground truth file not found for hypothesis {hyp_path} (expected at {gt_path})")
 
-                processed_gt = preprocess_text(raw_gt, convert_to_traditional=False)
-                processed_hyp = preprocess_text(raw_hyp, convert_to_traditional=True)
+    task_batches = [tasks[i:i + PAIR_BATCH_SIZE] for i in range(0, len(tasks), PAIR_BATCH_SIZE)]
+    with ProcessPoolExecutor() as executor:
+        for result in chain.from_iterable(executor.map(process_file_pairs, task_batches)):
+            file_pairs_found += 1
+            logger.info(f"--- Processing Pair {file_pairs_found} (Method: {result['method']}) ---")
+            logger.info(f"  GT_File: {result['gt_file']}")
+            logger.info(f"  HYP_File: {result['hyp_file']}")
+
+            if result["errors"]:
+                for error_message in result["errors"]:
+                    logger.error(error_message)
+                logger.warning("  Skipping pair due to read error for one or both files.")
+                logger.info("--- End Pair Processing ---")
+                continue
 
-                logger.info(f"  Processed GT (Traditional): '{processed_gt}'")
-                logger.info(f"  Processed HYP (Traditional): '{processed_hyp}'")
+            logger.info(f"  Processed GT (Traditional): '{result['processed_gt']}'")
+            logger.info(f"  Processed HYP (Traditional): '{result['processed_hyp']}'")
 
-                metrics = calculate_stt_metrics(processed_gt, processed_hyp)
-                logger.info(f"  Metrics: WER={metrics['WER']:.4f}, WRR={metrics['WRR']:.4f}, CER={metrics['CER']:.4f}")
+            metrics = result["metrics"]
+            logger.info(f"  Metrics: WER={metrics['WER']:.4f}, WRR={metrics['WRR']:.4f}, CER={metrics['CER']:.4f}")
 
-                all_results_data.append({
-                    "method": method_name,
-                    "gt_file": gt_path,
-                    "hyp_file": hyp_path,
-                    **metrics
-                })
-                files_processed_successfully += 1
-                logger.info("--- End Pair Processing ---")
-            else:
-                
-                logger.debug(f"Ground truth file not found for hypothesis {hyp_path} (expected at {gt_path})")
+            summary = method_summary[result["method"]]
+            summary["total_wer"] += metrics["WER"]
+            summary["total_wrr"] += metrics["WRR"]
+            summary["total_cer"] += metrics["CER"]
+            summary["count"] += 1
+            files_processed_successfully += 1
+            logger.info("--- End Pair Processing ---")
 
 
     logger.info(f"Finished processing files. Total pairs found: {file_pairs_found}. Pairs successfully processed: {files_processed_successfully}.")
 
     if files_processed_successfully > 0:
-        generate_summary_report(all_results_data)
+        generate_summary_report(method_summary)
     else:
         logger.info("No files were successfully processed, so no summary report will be generated.")
 
 
-def generate_summary_report(all_results_data):
-    """Generates a CSV summary report of metrics grouped by method."""
-    if not all_results_data:
+def generate_summary_report(method_summary):
+    """Generates a CSV summary report from per-method metric totals."""
+    if not method_summary:
         logger.info("No data available to generate summary report.")
         return
 
-    method_summary = defaultdict(lambda: {"total_wer": 0, "total_wrr": 0, "total_cer": 0, "count": 0})
-
-    for result in all_results_data:
-        method = result["method"]
-        method_summary[method]["total_wer"] += result["WER"]
-        method_summary[method]["total_wrr"] += result["WRR"]
-        method_summary[method]["total_cer"] += result["CER"]
-        method_summary[method]["count"] += 1
-
     logger.info(f"Generating summary report at: {SUMMARY_REPORT_FILE}")
 
     try:
@@ -3,7 +3,13 @@ import re
 import opencc
 import logging
 import csv
+import multiprocessing
+import numpy as np
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from functools import lru_cache
+from itertools import chain
 from tqdm import tqdm
 
 try:
@@ -12,11 +18,35 @@ try:
 except ImportError:
     SPEECHBRAIN_AVAILABLE = False
 
+try:
+    from rapidfuzz.distance import Levenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 DETAILED_LOG_FILE = "stt_evaluation_details_speechbrain.log"
 SUMMARY_REPORT_FILE = "stt_summary_report_speechbrain.csv"
 HYPOTHESIS_FILE_EXTENSION = ".txt"
 GROUND_TRUTH_EXTENSION = ".vtt"
+# Character edit distances for CER come from RapidFuzz when installed; set to
+# False to score CER with SpeechBrain's ErrorRateStats instead.
+USE_RAPIDFUZZ_CER = RAPIDFUZZ_AVAILABLE
 OPENCC_CONFIG = 's2hk.json'
+PUNCTUATION_CHARS = (
+    r"""＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏﹑﹔·！？｡。"""
+    r"""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""
+)
+PUNCTUATION_DELETE_TABLE = str.maketrans('', '', PUNCTUATION_CHARS)
+WHITESPACE_REGEX = re.compile(r'\s+')
+VTT_TAG_REGEX = re.compile(r'<[^>]+>')
+DIGIT_REGEX = re.compile(r'\d+')
+TXT_HEADER_PREFIXES = ("Detected language", "TRANSCRIPTION:", "UTTERANCE ")
+PAIR_BATCH_SIZE = 16
+SUMMARY_WRITE_BUFFER_SIZE = 1 << 16
+GT_CACHE_SIZE = 256
+PROGRESS_MIN_INTERVAL_SECONDS = 0.5
+PROGRESS_POSTFIX_EVERY = 50
+LOG_BUFFER_CAPACITY = 1024
 
 def setup_logger():
     logger = logging.getLogger('STT_Evaluation_SpeechBrain')
@@ -27,11 +57,18 @@ def setup_logger():
     fh.setLevel(logging.INFO)
     formatter_fh = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     fh.setFormatter(formatter_fh)
-    logger.addHandler(fh)
+    # Buffer per-pair records in memory; errors and full buffers flush to disk.
+    logger.addHandler(MemoryHandler(LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=fh))
 
     return logger
 
-logger = setup_logger()
+# Spawned workers re-import this module before parent_process() is set, so match on
+# the process name; only the main process owns the file handler, workers forward
+# their records to it via init_worker_logging.
+if multiprocessing.current_process().name == "MainProcess":
+    logger = setup_logger()
+else:
+    logger = logging.getLogger('STT_Evaluation_SpeechBrain')
 
 if not SPEECHBRAIN_AVAILABLE:
     logger.error("SpeechBrain library not found. Please install it: pip install speechbrain")
@@ -44,38 +81,32 @@ except Exception as e:
                    "Proceeding without Chinese script conversion.")
     converter = None
 
+@lru_cache(maxsize=4096)
+def convert_chinese_script(text):
+    return converter.convert(text)
+
 def read_vtt_file(file_path):
     """Reads WebVTT file and extracts continuous text, removing timestamps and tags."""
-    lines = []
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line == "WEBVTT" or "-->" in line or not line:
-                    continue
-                line = re.sub(r'<[^>]+>', '', line)
-                lines.append(line)
+            stripped_lines = [line.strip() for line in f.read().split('\n')]
     except Exception as e:
         logger.error(f"Error reading VTT file {file_path}: {e}")
         return None
+    lines = [VTT_TAG_REGEX.sub('', line) for line in stripped_lines
+             if line and line != "WEBVTT" and "-->" not in line]
     return " ".join(lines)
 
 def read_txt_file(file_path):
     """Reads hypothesis TXT file, skipping specific header lines."""
-    transcription_lines = []
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("Detected language") or \
-                   line.startswith("TRANSCRIPTION:") or \
-                   line.startswith("UTTERANCE "):
-                    continue
-                if line:
-                    transcription_lines.append(line)
+            stripped_lines = [line.strip() for line in f.read().split('\n')]
     except Exception as e:
         logger.error(f"Error reading TXT file {file_path}: {e}")
         return None
+    transcription_lines = [line for line in stripped_lines
+                           if line and not line.startswith(TXT_HEADER_PREFIXES)]
     return " ".join(transcription_lines)
 
 def preprocess_text_for_logging(text, perform_chinese_conversion=False):
@@ -89,15 +120,10 @@ def preprocess_text_for_logging(text, perform_chinese_conversion=False):
     if not text:
         return ""
     if perform_chinese_conversion and converter:
-        text = converter.convert(text)
+        text = convert_chinese_script(text)
     
-    punctuation = (
-        r"""＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏﹑﹔·！？｡。"""
-        r"""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""
-    )
-    text = re.sub(f"[{re.escape(punctuation)}]", "", text)
-    text = text.lower()
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = text.translate(PUNCTUATION_DELETE_TABLE).lower()
+    text = WHITESPACE_REGEX.sub(' ', text).strip()
     return text
 
 def preprocess_text_for_metrics(text, perform_chinese_conversion=False):
@@ -111,18 +137,10 @@ def preprocess_text_for_metrics(text, perform_chinese_conversion=False):
     if not text:
         return ""
     if perform_chinese_conversion and converter:
-        original_text_snippet = text[:30]
-        text = converter.convert(text)
-        if text != original_text_snippet:
-             logger.debug(f"Applied OpenCC conversion for metrics: '{original_text_snippet}...' -> '{text[:30]}...'")
-
-    punctuation = (
-        r"""＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏﹑﹔·！？｡。"""
-        r"""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""
-    )
-    text = re.sub(f"[{re.escape(punctuation)}]", "", text)
-    text = text.lower()
-    text = re.sub(r'\s+', '', text)
+        text = convert_chinese_script(text)
+
+    text = text.translate(PUNCTUATION_DELETE_TABLE).lower()
+    text = WHITESPACE_REGEX.sub('', text)
     return text
 
 def calculate_stt_metrics_speechbrain(
@@ -134,77 +152,159 @@ def calculate_stt_metrics_speechbrain(
     WER reported is effectively CER.
     NSER is Number Sequence Error Rate.
     """
+    return calculate_stt_metrics_speechbrain_batch([
+        (ground_truth_str_cer, hypothesis_str_cer, ground_truth_str_nser, hypothesis_str_nser)
+    ])[0]
+
+def calculate_stt_metrics_speechbrain_batch(text_pairs):
+    """
+    Calculates STT metrics for many (gt_cer, hyp_cer, gt_nser, hyp_nser) pairs at once.
+    All non-trivial pairs go through one ErrorRateStats per metric; per-pair rates
+    are read back from its per-utterance scores.
+    """
     if not SPEECHBRAIN_AVAILABLE:
         logger.error("SpeechBrain not available for metrics calculation.")
-        return {"WER": float('nan'), "WRR": float('nan'), "CER": float('nan'), "SER": float('nan'), "NSER": float('nan')}
-
-    
-    calculated_wer = float('nan')
-    calculated_cer = float('nan')
-    wrr = float('nan')
-    ser_segment = float('nan')
-    calculated_nser = float('nan')
-
-    
-    if not ground_truth_str_cer and not hypothesis_str_cer:
-        calculated_wer, calculated_cer, ser_segment = 0.0, 0.0, 0.0
-        wrr = 1.0
-    elif not ground_truth_str_cer:
-        calculated_wer, calculated_cer, ser_segment = 1.0, 1.0, 1.0
-        wrr = 0.0
-    elif not hypothesis_str_cer:
-        calculated_wer, calculated_cer, ser_segment = 1.0, 1.0, 1.0
-        wrr = 0.0
-    else:
-        ref_tokens_cer = list(ground_truth_str_cer)
-        hyp_tokens_cer = list(hypothesis_str_cer)
+        return [
+            {"WER": float('nan'), "WRR": float('nan'), "CER": float('nan'), "SER": float('nan'), "NSER": float('nan')}
+            for _ in text_pairs
+        ]
+
+    all_metrics = []
+    cer_indices, cer_refs, cer_hyps = [], [], []
+    nser_indices, nser_refs, nser_hyps = [], [], []
+
+    for index, (ground_truth_str_cer, hypothesis_str_cer, ground_truth_str_nser, hypothesis_str_nser) in enumerate(text_pairs):
+        metrics = {"WER": float('nan'), "WRR": float('nan'), "CER": float('nan'), "SER": float('nan'), "NSER": float('nan')}
+
+        if ground_truth_str_cer == hypothesis_str_cer:
+            metrics.update(WER=0.0, CER=0.0, SER=0.0, WRR=1.0)
+        elif not ground_truth_str_cer or not hypothesis_str_cer:
+            metrics.update(WER=1.0, CER=1.0, SER=1.0, WRR=0.0)
+        else:
+            cer_indices.append(index)
+            cer_refs.append(ground_truth_str_cer)
+            cer_hyps.append(hypothesis_str_cer)
+
+        gt_numbers = DIGIT_REGEX.findall(ground_truth_str_nser)
+        hyp_numbers = DIGIT_REGEX.findall(hypothesis_str_nser)
+
+        if gt_numbers == hyp_numbers:
+            metrics["NSER"] = 0.0
+        elif not gt_numbers:
+            # An utterance without reference tokens cannot be scored; keep it out
+            # of the shared batch so it does not fail the other pairs.
+            logger.error("Error during NSER calculation with SpeechBrain: no reference numbers to score against.")
+            logger.error(f"  GT Numbers (count 0 from '{ground_truth_str_nser[:30]}...'): []")
+            logger.error(f"  HYP Numbers (count {len(hyp_numbers)} from '{hypothesis_str_nser[:30]}...'): {hyp_numbers[:10]}")
+        else:
+            nser_indices.append(index)
+            nser_refs.append(gt_numbers)
+            nser_hyps.append(hyp_numbers)
+
+        all_metrics.append(metrics)
+
+    if cer_indices and USE_RAPIDFUZZ_CER:
+        for index, ref_str, hyp_str in zip(cer_indices, cer_refs, cer_hyps):
+            calculated_cer = Levenshtein.distance(ref_str, hyp_str) / len(ref_str)
+            all_metrics[index].update(
+                WER=calculated_cer, CER=calculated_cer, WRR=1.0 - calculated_cer,
+                SER=1.0 if calculated_cer > 1e-9 else 0.0
+            )
+    elif cer_indices:
         try:
             error_computer_cer = ErrorRateStats()
-            error_computer_cer.append(ids=["segment1_cer"], predict=[hyp_tokens_cer], target=[ref_tokens_cer])
-            stats_cer = error_computer_cer.summarize()
-            error_val_cer = stats_cer.get('error_rate')
-
-            if error_val_cer is None:
-                logger.warning(f"SpeechBrain 'error_rate' for CER not found in summary: {stats_cer}. Defaulting error to 1.0 for this segment.")
-                error_val_cer = 100.0
-            
-            calculated_cer = error_val_cer / 100.0
-            calculated_wer = calculated_cer 
-            wrr = 1.0 - calculated_wer
-            ser_segment = 1.0 if calculated_wer > 1e-9 else 0.0
+            error_computer_cer.append(
+                ids=[f"segment{i}_cer" for i in cer_indices],
+                predict=[list(hyp_str) for hyp_str in cer_hyps],
+                target=[list(ref_str) for ref_str in cer_refs]
+            )
+            for index, score in zip(cer_indices, error_computer_cer.scores):
+                error_val_cer = score.get('WER')
+                if error_val_cer is None:
+                    logger.warning(f"SpeechBrain 'WER' for CER not found in utterance score: {score}. Defaulting error to 1.0 for this segment.")
+                    error_val_cer = 100.0
+
+                calculated_cer = error_val_cer / 100.0
+                all_metrics[index].update(
+                    WER=calculated_cer, CER=calculated_cer, WRR=1.0 - calculated_cer,
+                    SER=1.0 if calculated_cer > 1e-9 else 0.0
+                )
         except Exception as e:
             logger.error(f"Error during SpeechBrain CER/WER metrics calculation: {e}")
-            logger.error(f"  GT (CER len {len(ground_truth_str_cer)}): '{ground_truth_str_cer[:70]}...'")
-            logger.error(f"  HYP (CER len {len(hypothesis_str_cer)}): '{hypothesis_str_cer[:70]}...'")
+            for index in cer_indices:
+                ground_truth_str_cer, hypothesis_str_cer = text_pairs[index][:2]
+                logger.error(f"  GT (CER len {len(ground_truth_str_cer)}): '{ground_truth_str_cer[:70]}...'")
+                logger.error(f"  HYP (CER len {len(hypothesis_str_cer)}): '{hypothesis_str_cer[:70]}...'")
 
-    gt_numbers = re.findall(r'\d+', ground_truth_str_nser)
-    hyp_numbers = re.findall(r'\d+', hypothesis_str_nser)
-    
-    if not gt_numbers and not hyp_numbers:
-        calculated_nser = 0.0
-    elif SPEECHBRAIN_AVAILABLE :
+    if nser_indices:
         try:
             nser_computer = ErrorRateStats()
-            nser_computer.append(ids=["num_seq_1"], predict=[hyp_numbers], target=[gt_numbers])
-            stats_nser = nser_computer.summarize()
-            error_val_nser = stats_nser.get('error_rate')
-
-            if error_val_nser is None:
-                logger.warning(f"SpeechBrain 'error_rate' for NSER not found. GT_nums: {len(gt_numbers)}, HYP_nums: {len(hyp_numbers)}. Stats: {stats_nser}. Defaulting NSER to 1.0.")
-                calculated_nser = 1.0
-            else:
-                calculated_nser = error_val_nser / 100.0
+            nser_computer.append(ids=[f"num_seq_{i}" for i in nser_indices], predict=nser_hyps, target=nser_refs)
+            for index, gt_numbers, hyp_numbers, score in zip(nser_indices, nser_refs, nser_hyps, nser_computer.scores):
+                error_val_nser = score.get('WER')
+                if error_val_nser is None:
+                    logger.warning(f"SpeechBrain 'WER' for NSER not found. GT_nums: {len(gt_numbers)}, HYP_nums: {len(hyp_numbers)}. Score: {score}. Defaulting NSER to 1.0.")
+                    all_metrics[index]["NSER"] = 1.0
+                else:
+                    all_metrics[index]["NSER"] = error_val_nser / 100.0
         except Exception as e:
             logger.error(f"Error during NSER calculation with SpeechBrain: {e}")
-            logger.error(f"  GT Numbers (count {len(gt_numbers)} from '{ground_truth_str_nser[:30]}...'): {gt_numbers[:10]}")
-            logger.error(f"  HYP Numbers (count {len(hyp_numbers)} from '{hypothesis_str_nser[:30]}...'): {hyp_numbers[:10]}")
-    else:
-        logger.warning("SpeechBrain not available, cannot calculate NSER.")
-
-    return {
-        "WER": calculated_wer, "WRR": wrr, "CER": calculated_cer, "SER": ser_segment,
-        "NSER": calculated_nser
-    }
+            for index, gt_numbers, hyp_numbers in zip(nser_indices, nser_refs, nser_hyps):
+                logger.error(f"  GT Numbers (count {len(gt_numbers)} from '{text_pairs[index][2][:30]}...'): {gt_numbers[:10]}")
+                logger.error(f"  HYP Numbers (count {len(hyp_numbers)} from '{text_pairs[index][3][:30]}...'): {hyp_numbers[:10]}")
+
+    return all_metrics
+
+def init_worker_logging(log_queue):
+    """Routes the worker's log records to the parent's handlers through a queue."""
+    worker_logger = logging.getLogger('STT_Evaluation_SpeechBrain')
+    worker_logger.handlers = [QueueHandler(log_queue)]
+    worker_logger.setLevel(logging.INFO)
+
+def normalize_transcript(raw_text):
+    """Returns the readable/NSER text and the whitespace-free CER text for one raw transcript."""
+    if converter is not None:
+        raw_text = convert_chinese_script(raw_text)
+    readable_text = preprocess_text_for_logging(raw_text, perform_chinese_conversion=False)
+    # Same normalization as preprocess_text_for_metrics: the readable text only
+    # differs by its single separating spaces.
+    return readable_text, readable_text.replace(' ', '')
+
+@lru_cache(maxsize=GT_CACHE_SIZE)
+def load_ground_truth(gt_path):
+    """Reads and normalizes a ground-truth VTT once per worker; every method's hypothesis for it reuses the result."""
+    raw_gt = read_vtt_file(gt_path)
+    if raw_gt is None:
+        return None
+    return normalize_transcript(raw_gt)
+
+def prepare_file_pair(task):
+    """Reads and preprocesses one GT/hypothesis pair inside a worker process."""
+    gt_path, hyp_path, method_name = task
+    result = {"method": method_name, "gt_path": gt_path, "hyp_path": hyp_path, "read_error": False}
+
+    ground_truth = load_ground_truth(gt_path)
+    raw_hyp = read_txt_file(hyp_path)
+    if ground_truth is None or raw_hyp is None:
+        result["read_error"] = True
+        return result
+
+    result["gt_for_readable_log_and_nser"], result["processed_gt_for_cer"] = ground_truth
+    result["hyp_for_readable_log_and_nser"], result["processed_hyp_for_cer"] = normalize_transcript(raw_hyp)
+    return result
+
+def process_file_pairs(task_batch):
+    """Prepares a batch of GT/hypothesis pairs and scores them with one batched metrics call."""
+    results = [prepare_file_pair(task) for task in task_batch]
+    readable = [result for result in results if not result["read_error"]]
+    batch_metrics = calculate_stt_metrics_speechbrain_batch([
+        (result["processed_gt_for_cer"], result["processed_hyp_for_cer"],
+         result["gt_for_readable_log_and_nser"], result["hyp_for_readable_log_and_nser"])
+        for result in readable
+    ])
+    for result, metrics in zip(readable, batch_metrics):
+        result["metrics"] = metrics
+    return results
 
 def main(root_dir):
     all_results_data = []
@@ -221,81 +321,88 @@ def main(root_dir):
     logger.info(f"Detailed logs will be saved to: {DETAILED_LOG_FILE}")
     logger.info(f"Summary report will be saved to: {SUMMARY_REPORT_FILE}")
 
-    walk_items = list(os.walk(root_dir))
-    if not walk_items:
-        logger.warning(f"Root directory '{root_dir}' is empty or not accessible.")
-        return
-
-    main_pbar = tqdm(walk_items, desc="Scanning Dirs", unit="dir", position=0, dynamic_ncols=True)
-    for subdir, _, files in main_pbar:
-        current_dir_name = os.path.relpath(subdir, root_dir) if subdir != root_dir else os.path.basename(root_dir)
-        if not current_dir_name or current_dir_name == '.':
-            current_dir_name = os.path.basename(root_dir)
-        main_pbar.set_description(f"Processing Dir: {current_dir_name[:30]}")
-
-        hyp_files_in_subdir = [f for f in files if f.endswith(HYPOTHESIS_FILE_EXTENSION)]
-        if not hyp_files_in_subdir:
-            continue
-
-        sub_pbar = tqdm(hyp_files_in_subdir, desc="Files", unit="file", leave=False, position=1, dynamic_ncols=True)
-        for hyp_file_name in sub_pbar:
-            sub_pbar.set_description(f"{hyp_file_name[:25].ljust(25)}...")
-
+    tasks = []
+    scanned_any_dir = False
+    for subdir, _, files in os.walk(root_dir):
+        scanned_any_dir = True
+        files_set = set(files)
+        hyp_files_by_base = defaultdict(list)
+        for hyp_file_name in files:
+            if not hyp_file_name.endswith(HYPOTHESIS_FILE_EXTENSION):
+                continue
             base_with_method = hyp_file_name[:-len(HYPOTHESIS_FILE_EXTENSION)]
-            parts = base_with_method.rsplit('.', 1)
-            if len(parts) == 2:
-                base_name_for_gt = parts[0]
-                method_name = parts[1]
-            else:
+            base_name_for_gt, separator, method_name = base_with_method.rpartition('.')
+            if not separator:
                 base_name_for_gt = base_with_method 
                 method_name = "unknown_method"
-                logger.debug(f"Could not parse method from hyp_file '{hyp_file_name}'. Using method '{method_name}'. Expected format 'basename.method.txt'.")
-            
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Could not parse method from hyp_file '{hyp_file_name}'. Using method '{method_name}'. Expected format 'basename.method.txt'.")
+            hyp_files_by_base[base_name_for_gt].append((hyp_file_name, method_name))
+
+        # Queue every method of one basename back to back so workers reuse the cached GT.
+        for base_name_for_gt, hyp_entries in hyp_files_by_base.items():
             gt_file_name = base_name_for_gt + GROUND_TRUTH_EXTENSION
             gt_path = os.path.join(subdir, gt_file_name)
-            hyp_path = os.path.join(subdir, hyp_file_name)
+            gt_exists = gt_file_name in files_set
+            for hyp_file_name, method_name in hyp_entries:
+                hyp_path = os.path.join(subdir, hyp_file_name)
+                if gt_exists:
+                    tasks.append((gt_path, hyp_path, method_name))
+                elif logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Ground truth file not found for hypothesis {hyp_path} (expected at {gt_path})")
+
+    if not scanned_any_dir:
+        logger.warning(f"Root directory '{root_dir}' is empty or not accessible.")
+        return
 
-            if os.path.exists(gt_path):
+    log_queue = multiprocessing.Queue()
+    log_listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    log_listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=init_worker_logging, initargs=(log_queue,)) as executor:
+            task_batches = [tasks[i:i + PAIR_BATCH_SIZE] for i in range(0, len(tasks), PAIR_BATCH_SIZE)]
+            pair_pbar = tqdm(chain.from_iterable(executor.map(process_file_pairs, task_batches)), total=len(tasks),
+                             desc="Processing Pairs", unit="file", dynamic_ncols=True,
+                             mininterval=PROGRESS_MIN_INTERVAL_SECONDS, smoothing=0.1)
+            for result in pair_pbar:
                 file_pairs_found += 1
-                logger.info(f"--- Processing Pair {file_pairs_found} (Method: {method_name}) ---")
-                logger.info(f"  GT_File: {gt_path}")
-                logger.info(f"  HYP_File: {hyp_path}")
-
-                raw_gt = read_vtt_file(gt_path)
-                raw_hyp = read_txt_file(hyp_path)
-
-                if raw_gt is None or raw_hyp is None:
+                if file_pairs_found % PROGRESS_POSTFIX_EVERY == 0:
+                    pair_pbar.set_postfix(success=files_processed_successfully, refresh=False)
+                method_name = result["method"]
+                gt_path = result["gt_path"]
+                hyp_path = result["hyp_path"]
+                log_pair_details = logger.isEnabledFor(logging.INFO)
+
+                if result["read_error"]:
+                    if log_pair_details:
+                        logger.info(
+                            f"--- Processing Pair {file_pairs_found} (Method: {method_name}) ---\n"
+                            f"  GT_File: {gt_path}\n"
+                            f"  HYP_File: {hyp_path}"
+                        )
                     logger.warning(f"  Skipping pair due to read error: GT='{gt_path}', HYP='{hyp_path}'")
                     logger.info("--- End Pair Processing (Read Error) ---")
-                    main_pbar.set_postfix(pairs=file_pairs_found, success=files_processed_successfully, refresh=True)
                     continue
-                
-                logger.debug(f"Raw GT (Pair {file_pairs_found} {os.path.basename(gt_path)}): '{raw_gt[:70]}{'...' if len(raw_gt)>70 else ''}'")
-                logger.debug(f"Raw HYP (Pair {file_pairs_found} {os.path.basename(hyp_path)}): '{raw_hyp[:70]}{'...' if len(raw_hyp)>70 else ''}'")
-
-                apply_conversion = converter is not None
-                
-                gt_for_readable_log_and_nser = preprocess_text_for_logging(raw_gt, perform_chinese_conversion=apply_conversion)
-                hyp_for_readable_log_and_nser = preprocess_text_for_logging(raw_hyp, perform_chinese_conversion=apply_conversion)
-
-                processed_gt_for_cer = preprocess_text_for_metrics(raw_gt, perform_chinese_conversion=apply_conversion)
-                processed_hyp_for_cer = preprocess_text_for_metrics(raw_hyp, perform_chinese_conversion=apply_conversion)
-
-                logger.info(f"(Method: {method_name}) Pair {file_pairs_found}:")
-                logger.info(f"  GT  (readable/NSER): '{gt_for_readable_log_and_nser[:70]}...' (len: {len(gt_for_readable_log_and_nser)})")
-                logger.info(f"  HYP (readable/NSER): '{hyp_for_readable_log_and_nser[:70]}...' (len: {len(hyp_for_readable_log_and_nser)})")
-                logger.info(f"  GT  (for CER metrics): '{processed_gt_for_cer[:50]}...' (len: {len(processed_gt_for_cer)})")
-                logger.info(f"  HYP (for CER metrics): '{processed_hyp_for_cer[:50]}...' (len: {len(processed_hyp_for_cer)})")
-
-                metrics = calculate_stt_metrics_speechbrain(
-                    processed_gt_for_cer,
-                    processed_hyp_for_cer,
-                    gt_for_readable_log_and_nser, 
-                    hyp_for_readable_log_and_nser  
-                )
-                
-                logger.info(f"  Metrics (Pair {file_pairs_found} {os.path.basename(hyp_path)}):")
-                logger.info(f"    WER (CER)={metrics['WER']:.4f}, WRR (CRR)={metrics['WRR']:.4f}, CER={metrics['CER']:.4f}, SER={metrics['SER']:.4f}, NSER={metrics['NSER']:.4f}")
+
+                metrics = result["metrics"]
+                if log_pair_details:
+                    gt_for_readable_log_and_nser = result["gt_for_readable_log_and_nser"]
+                    hyp_for_readable_log_and_nser = result["hyp_for_readable_log_and_nser"]
+                    processed_gt_for_cer = result["processed_gt_for_cer"]
+                    processed_hyp_for_cer = result["processed_hyp_for_cer"]
+                    logger.info(
+                        f"--- Processing Pair {file_pairs_found} (Method: {method_name}) ---\n"
+                        f"  GT_File: {gt_path}\n"
+                        f"  HYP_File: {hyp_path}\n"
+                        f"(Method: {method_name}) Pair {file_pairs_found}:\n"
+                        f"  GT  (readable/NSER): '{gt_for_readable_log_and_nser[:70]}...' (len: {len(gt_for_readable_log_and_nser)})\n"
+                        f"  HYP (readable/NSER): '{hyp_for_readable_log_and_nser[:70]}...' (len: {len(hyp_for_readable_log_and_nser)})\n"
+                        f"  GT  (for CER metrics): '{processed_gt_for_cer[:50]}...' (len: {len(processed_gt_for_cer)})\n"
+                        f"  HYP (for CER metrics): '{processed_hyp_for_cer[:50]}...' (len: {len(processed_hyp_for_cer)})\n"
+                        f"  Metrics (Pair {file_pairs_found} {os.path.basename(hyp_path)}):\n"
+                        f"    WER (CER)={metrics['WER']:.4f}, WRR (CRR)={metrics['WRR']:.4f}, CER={metrics['CER']:.4f}, SER={metrics['SER']:.4f}, NSER={metrics['NSER']:.4f}\n"
+                        f"--- End Pair Processing ---"
+                    )
 
                 all_results_data.append({
                     "method": method_name,
@@ -304,13 +411,9 @@ def main(root_dir):
                     **metrics 
                 })
                 files_processed_successfully += 1
-                logger.info("--- End Pair Processing ---")
-            else:
-                logger.debug(f"Ground truth file not found for hypothesis {hyp_path} (expected at {gt_path})")
-            
-            main_pbar.set_postfix(pairs=file_pairs_found, success=files_processed_successfully, refresh=True)
-        sub_pbar.close()
-    main_pbar.close()
+            pair_pbar.close()
+    finally:
+        log_listener.stop()
 
     logger.info(f"Finished processing files. Total pairs found: {file_pairs_found}. Pairs successfully processed: {files_processed_successfully}.")
 
@@ -324,60 +427,41 @@ def generate_summary_report(all_results_data):
         logger.info("No data available to generate summary report.")
         return
 
-    method_summary = defaultdict(lambda: {
-        "total_wer": 0.0, "total_wrr": 0.0, "total_cer": 0.0, "total_ser": 0.0, "total_nser": 0.0,
-        "count": 0, "nan_count": 0
-    })
-
-    for result in all_results_data:
-        method = result["method"]
-        current_metrics = [result["WER"], result["WRR"], result["CER"], result["SER"], result["NSER"]]
-        if any(m != m for m in current_metrics): 
-            method_summary[method]["nan_count"] += 1
-            logger.warning(f"NaN metric found for method '{method}', file '{result['hyp_file']}'. It will be excluded from averages.")
-            continue 
-
-        method_summary[method]["total_wer"] += result["WER"]
-        method_summary[method]["total_wrr"] += result["WRR"]
-        method_summary[method]["total_cer"] += result["CER"]
-        method_summary[method]["total_ser"] += result["SER"]
-        method_summary[method]["total_nser"] += result["NSER"] 
-        method_summary[method]["count"] += 1
-    
+    methods = np.array([result["method"] for result in all_results_data])
+    metric_matrix = np.array(
+        [[result["WER"], result["WRR"], result["CER"], result["SER"], result["NSER"]] for result in all_results_data],
+        dtype=np.float64
+    )
+    valid_rows = ~np.isnan(metric_matrix).any(axis=1)
+    for row_index in np.flatnonzero(~valid_rows):
+        result = all_results_data[row_index]
+        logger.warning(f"NaN metric found for method '{result['method']}', file '{result['hyp_file']}'. It will be excluded from averages.")
+
+    sorted_methods, method_index = np.unique(methods, return_inverse=True)
+    method_count = len(sorted_methods)
+    counts = np.bincount(method_index, weights=valid_rows, minlength=method_count).astype(np.int64)
+    nan_counts = np.bincount(method_index, weights=~valid_rows, minlength=method_count).astype(np.int64)
+    metric_sums = np.stack([
+        np.bincount(method_index, weights=np.where(valid_rows, metric_matrix[:, column], 0.0), minlength=method_count)
+        for column in range(metric_matrix.shape[1])
+    ], axis=1)
+    metric_averages = np.divide(metric_sums, counts[:, None], out=np.zeros_like(metric_sums), where=counts[:, None] > 0)
+
     logger.info(f"Generating summary report at: {SUMMARY_REPORT_FILE}")
     try:
-        with open(SUMMARY_REPORT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'Method', 'File_Count (Valid Metrics)',
-                'Average_WER (CER)', 'Average_WRR (CRR)', 'Average_CER', 'Average_SER', 'Average_NSER',
-                'Files_With_Metric_Errors'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            sorted_methods = sorted(method_summary.keys())
-
-            for method in sorted_methods:
-                data = method_summary[method]
-                count = data['count']
-                nan_count = data['nan_count']
-                
-                avg_wer = data['total_wer'] / count if count > 0 else 0
-                avg_wrr = data['total_wrr'] / count if count > 0 else 0
-                avg_cer = data['total_cer'] / count if count > 0 else 0
-                avg_ser = data['total_ser'] / count if count > 0 else 0
-                avg_nser = data['total_nser'] / count if count > 0 else 0 
-                
-                writer.writerow({
-                    'Method': method,
-                    'File_Count (Valid Metrics)': count,
-                    'Average_WER (CER)': f"{avg_wer:.4f}",
-                    'Average_WRR (CRR)': f"{avg_wrr:.4f}",
-                    'Average_CER': f"{avg_cer:.4f}",
-                    'Average_SER': f"{avg_ser:.4f}",
-                    'Average_NSER': f"{avg_nser:.4f}", 
-                    'Files_With_Metric_Errors': nan_count
-                })
+        fieldnames = [
+            'Method', 'File_Count (Valid Metrics)',
+            'Average_WER (CER)', 'Average_WRR (CRR)', 'Average_CER', 'Average_SER', 'Average_NSER',
+            'Files_With_Metric_Errors'
+        ]
+        rows = [
+            [method, count, *(f"{average:.4f}" for average in averages), nan_count]
+            for method, count, nan_count, averages in zip(sorted_methods, counts, nan_counts, metric_averages)
+        ]
+        with open(SUMMARY_REPORT_FILE, 'w', newline='', encoding='utf-8', buffering=SUMMARY_WRITE_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(rows)
         logger.info("Summary report generated successfully.")
     except IOError as e:
         logger.error(f"Failed to write summary report: {e}")
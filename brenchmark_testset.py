@@ -1,26 +1,127 @@
 import os
 import re
+import codecs
+import importlib.util
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from speechbrain.utils.metric_stats import ErrorRateStats
 import cn2an
 from numerizer import numerize 
-from collections import Counter
+from collections import Counter, defaultdict, deque
 import logging
 import json 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# pyarrow is only checked for here and imported where it is used, since importing it is slow.
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
 
 
 ENG_DIGIT_KMB_REGEX = re.compile(r"(\d+(?:\.\d+)?)\s*([KMB])\b", re.IGNORECASE)
 DIGIT_REGEX = re.compile(r'\d+(?:\.\d+)?')
+NOISE_LEVEL_REGEX = re.compile(r"noisy_(\d+)", re.IGNORECASE)
+# Matched from the end of the VTT stem: '<stem>.<stt_method>.txt'.
+STT_METHOD_SUFFIX_REGEX = re.compile(r"\.(.+)\.txt", re.DOTALL)
+# Prediction file name (after the last slash or backslash) of an api_call_durations.csv output_path and
+# its STT method: the last dot-separated part once a trailing '.txt' is removed. MethodPrefix is
+# everything before the method and is unmatched when the name has no other dot-separated part.
+DURATION_OUTPUT_PATH_REGEX = re.compile(
+    r"(?P<PredictionFile>(?P<MethodPrefix>[^/\\]*?\.)??(?P<STT_Method>[^./\\]*?)(?:\.txt)?)$"
+)
 
 CH_NUM_CHARS_ONLY = "零一二三四五六七八九十拾百佰千仟萬万億亿兆兩俩幺壹貳參肆伍陸柒捌玖貮點点"
 CHINESE_NUMBER_CANDIDATE_REGEX = re.compile(rf"[{CH_NUM_CHARS_ONLY}\d.]+")
+# Text without any of these characters can only yield bare '.' candidates, which never convert.
+CHINESE_NUMBER_CHAR_REGEX = re.compile(rf"[{CH_NUM_CHARS_ONLY}\d]")
+FULLWIDTH_DIGIT_TABLE = str.maketrans("０１２３４５６７８９", "0123456789")
+# Pure-ASCII candidates cn2an accepts in "smart" mode; those are read with float() directly.
+ASCII_DECIMAL_REGEX = re.compile(r'\d+(?:\.\d+)?', re.ASCII)
 
 
 PUNCT_WESTERN_STR = r"!\"#$%&'()*+,-./:;<=>?@\[\\\]^_`{|}~" 
 PUNCT_CJK_STR = r"＂＃＄％＆＇（）＊＋，－／：；＜＝＞＠［＼］＾＿｀｛｜｝～｟｠｢｣､、〃》「」『』【】〔〕〖〗〘〙〚〛〜〝〞〟〰〾〿–—‘’‛“”„‟…‧﹏."
-ALL_PUNCTUATION_CHARS = set(PUNCT_WESTERN_STR + PUNCT_CJK_STR)
+ALL_PUNCTUATION_CHARS = frozenset(PUNCT_WESTERN_STR + PUNCT_CJK_STR)
+# Chinese drops every punctuation mark; other languages keep apostrophes inside words.
+ZH_PUNCT_DELETE_TABLE = str.maketrans('', '', PUNCT_WESTERN_STR + PUNCT_CJK_STR)
+NON_ZH_PUNCT_DELETE_TABLE = str.maketrans('', '', PUNCT_WESTERN_STR.replace("'", "") + PUNCT_CJK_STR)
+# Byte-level equivalents of lower() + NON_ZH_PUNCT_DELETE_TABLE for pure-ASCII text.
+ASCII_LOWER_TABLE = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+NON_ZH_ASCII_PUNCT_BYTES = bytes(sorted({
+    ord(c) for c in PUNCT_WESTERN_STR.replace("'", "") + PUNCT_CJK_STR if ord(c) < 128
+}))
+# Lookup table flagging segment separators by codepoint: punctuation plus every character
+# for which str.isspace() is true (all of them live in the BMP). The extra last slot stands
+# in for every codepoint above the BMP, none of which is a separator.
+SEPARATOR_LOOKUP = np.zeros(0x10001, dtype=bool)
+SEPARATOR_LOOKUP[[ord(c) for c in ALL_PUNCTUATION_CHARS]] = True
+SEPARATOR_LOOKUP[[cp for cp in range(0x10000) if chr(cp).isspace()]] = True
+# Below this many vocabulary items plain substring checks beat building an automaton.
+VOCAB_AUTOMATON_MIN_SIZE = 32
+FILE_TASK_CHUNKSIZE = 8
+RESULT_WRITER_THREADS = 4
+FILE_PREFETCH_THREADS = 8
+LOG_FILE_BUFFER_SIZE = 1 << 16
+VTT_CACHE_SIZE = 2048
+
+GENERIC_RESULT_COLUMNS = [
+    "TestCase", "LanguageSubFolder", "FolderType", "NoiseLevel_Percent",
+    "GroundTruthFile", "PredictionFile", "STT_Method",
+    "WER", "WRR_Percent", "NumberAccuracy_Percent", "VocabularyAccuracy_Percent",
+    "ResponseSpeed_s", "GT_Text_Raw", "Pred_Text_Raw",
+    "GT_Numbers_Extracted", "Pred_Numbers_Extracted",
+    "GT_Vocabs_Found", "Pred_Vocabs_Matched"
+]
+WER_COLUMN_INDEX = GENERIC_RESULT_COLUMNS.index("WER")
+WRR_COLUMN_INDEX = GENERIC_RESULT_COLUMNS.index("WRR_Percent")
+GENERIC_RESULT_CATEGORY_DTYPES = {"NoiseLevel_Percent": "category", "STT_Method": "category"}
+# Repeated-string columns stored as categoricals in the combined results.
+LOW_CARDINALITY_RESULT_COLUMNS = ("TestCase", "LanguageSubFolder", "FolderType", "NoiseLevel_Percent", "STT_Method", "GroundTruthFile")
+
+# None of the log formats use process, thread or multiprocessing names, so skip
+# collecting them on every record (the pid lookup in particular).
+logging.logProcesses = False
+logging.logThreads = False
+logging.logMultiprocessing = False
+
+
+def _read_text_file(file_path):
+    """
+    Reads a UTF-8 file in one binary read, translating newlines like text mode does.
+    Pure-ASCII content is decoded with the ASCII codec.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.decode('ascii') if data.isascii() else data.decode('utf-8')
+
+@lru_cache(maxsize=VTT_CACHE_SIZE)
+def _load_vtt(file_path):
+    """
+    Reads a VTT file once and returns (full_text, segments): the whitespace-normalized transcript
+    and the stripped caption lines, skipping everything before the WEBVTT header, blank lines,
+    NOTE lines and cue timings. Cached because every prediction of a VTT re-reads it in the same worker.
+    """
+    stripped_lines = [line.strip() for line in _read_text_file(file_path).split('\n')]
 
+    try:
+        captions_start = stripped_lines.index("WEBVTT") + 1
+    except ValueError:
+        return "", ()
+    segments = tuple(
+        line for line in stripped_lines[captions_start:]
+        if line and not line.startswith("NOTE") and "-->" not in line
+    )
+    return ' '.join(" ".join(segments).split()), segments
 
 def parse_vtt(file_path):
     """
@@ -28,72 +129,29 @@ def parse_vtt(file_path):
     Normalizes whitespace to single spaces.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        return _load_vtt(file_path)[0]
     except Exception as e:
         logging.warning(f"Could not read VTT file {file_path}: {e}")
         return ""
 
-    content_lines = []
-    captions_started = False
-    for line in lines:
-        line_stripped = line.strip()
-        if not line_stripped:
-            continue
-        if line_stripped == "WEBVTT":
-            captions_started = True
-            continue
-        if not captions_started:
-            continue
-        if line_stripped.startswith("NOTE"):
-            continue
-        if "-->" in line_stripped:  
-            continue
-        content_lines.append(line_stripped)
-    
-    full_text = " ".join(content_lines)
-    return re.sub(r'\s+', ' ', full_text).strip()
-
 def get_vtt_segments(file_path):
     """
     Parses a VTT file and returns a list of individual caption/segment texts.
     Used for Test Case 4 (Segmentation Accuracy).
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        return list(_load_vtt(file_path)[1])
     except Exception as e:
         logging.warning(f"Could not read VTT file {file_path} for segments: {e}")
         return []
 
-    segment_texts = []
-    captions_started = False
-    for line in lines:
-        line_stripped = line.strip()
-        if not line_stripped:
-            continue
-        if line_stripped == "WEBVTT":
-            captions_started = True
-            continue
-        if not captions_started:
-            continue
-        if line_stripped.startswith("NOTE"):
-            continue
-        if "-->" in line_stripped:  
-            continue
-        
-        segment_texts.append(line_stripped)
-    return segment_texts
-
 def parse_txt(file_path):
     """
     Reads a text file and returns its content.
     Normalizes whitespace to single spaces.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return re.sub(r'\s+', ' ', content).strip()
+        return ' '.join(_read_text_file(file_path).split())
     except Exception as e:
         logging.warning(f"Could not read TXT file {file_path}: {e}")
         return ""
@@ -107,26 +165,26 @@ def get_tokens_for_wer(text, language_code):
     """
     
     if language_code.startswith("zh"):
-        translator = str.maketrans('', '', PUNCT_WESTERN_STR + PUNCT_CJK_STR)
-        text_no_punct = text.translate(translator)
-        text_no_space = re.sub(r'\s+', '', text_no_punct)
+        text_no_punct = text.translate(ZH_PUNCT_DELETE_TABLE)
+        text_no_space = ''.join(text_no_punct.split())
         return list(text_no_space)
+    elif text.isascii():
+        text_no_punct = text.encode('ascii').translate(ASCII_LOWER_TABLE, NON_ZH_ASCII_PUNCT_BYTES).decode('ascii')
+        return text_no_punct.split()
     elif language_code.startswith("en"):
         text = text.lower()
-        
-        
-        punct_to_remove_en = PUNCT_WESTERN_STR.replace("'", "") + PUNCT_CJK_STR 
-        translator = str.maketrans('', '', punct_to_remove_en)
-        text_no_punct = text.translate(translator)
-        text_normalized_space = re.sub(r'\s+', ' ', text_no_punct).strip()
-        return text_normalized_space.split()
+        text_no_punct = text.translate(NON_ZH_PUNCT_DELETE_TABLE)
+        return text_no_punct.split()
     else: 
         text = text.lower() 
-        punct_to_remove_other = PUNCT_WESTERN_STR.replace("'", "") + PUNCT_CJK_STR
-        translator = str.maketrans('', '', punct_to_remove_other)
-        text_no_punct = text.translate(translator)
-        text_normalized_space = re.sub(r'\s+', ' ', text_no_punct).strip()
-        return text_normalized_space.split()
+        text_no_punct = text.translate(NON_ZH_PUNCT_DELETE_TABLE)
+        return text_no_punct.split()
+
+
+@lru_cache(maxsize=4096)
+def _cn2an_smart(text):
+    """Cached cn2an "smart" conversion; the same short candidates recur across files."""
+    return cn2an.cn2an(text, "smart")
 
 
 def extract_and_normalize_numbers(text, language_code):
@@ -138,7 +196,7 @@ def extract_and_normalize_numbers(text, language_code):
     if not text:
         return []
 
-    text = text.translate(str.maketrans("０１２３４５６７８９", "0123456789"))
+    text = text.translate(FULLWIDTH_DIGIT_TABLE)
 
     if language_code.startswith("en"):
         def replace_kmb(match_obj):
@@ -164,10 +222,17 @@ def extract_and_normalize_numbers(text, language_code):
             except ValueError:
                 logging.info(f"Could not convert '{num_str}' to float after processing: {text_after_numerizer}")
     elif language_code.startswith("zh"):
+        if not CHINESE_NUMBER_CHAR_REGEX.search(text):
+            return []
         potential_num_strings = CHINESE_NUMBER_CANDIDATE_REGEX.findall(text)
         for s in potential_num_strings:
             try:
-                val = cn2an.cn2an(s, "smart") 
+                if s.isascii():
+                    if not ASCII_DECIMAL_REGEX.fullmatch(s):
+                        continue
+                    val = float(s)
+                else:
+                    val = _cn2an_smart(s) 
                 if isinstance(val, float) and val == int(val):
                     normalized_numbers.append(str(int(val)))
                 elif isinstance(val, (float, int)):
@@ -183,15 +248,19 @@ def calculate_number_accuracy(gt_numbers, pred_numbers):
     if not gt_numbers:
         return 1.0 if not pred_numbers else 0.0 
     
-    gt_counts = Counter(gt_numbers)
-    pred_counts = Counter(pred_numbers)
-    
-    correct_matches = 0
-    for num_val, count_in_gt in gt_counts.items():
-        correct_matches += min(count_in_gt, pred_counts.get(num_val, 0))
-        
-    accuracy = correct_matches / len(gt_numbers) if len(gt_numbers) > 0 else (1.0 if not pred_numbers else 0.0)
-    return accuracy
+    correct_matches = sum((Counter(gt_numbers) & Counter(pred_numbers)).values())
+    return correct_matches / len(gt_numbers)
+
+
+@lru_cache(maxsize=8)
+def _build_vocab_automaton(vocab_keys):
+    """Builds an Aho-Corasick automaton over the non-empty case-folded vocabulary items."""
+    automaton = ahocorasick.Automaton()
+    for vocab_key in vocab_keys:
+        if vocab_key:
+            automaton.add_word(vocab_key, vocab_key)
+    automaton.make_automaton()
+    return automaton
 
 
 def calculate_vocabulary_accuracy(gt_text, pred_text, vocabulary_list, vtt_stem, stt_method):
@@ -210,14 +279,26 @@ def calculate_vocabulary_accuracy(gt_text, pred_text, vocabulary_list, vtt_stem,
     logging.info(f"      Prediction Text (snippet): '{pred_text[:100]}...'")
     logging.info(f"      Vocabulary List contains {len(vocabulary_list)} items.")
 
-    for vocab_item in vocabulary_list:
-        vocab_item_str = str(vocab_item) 
-        
-        gt_has_vocab = vocab_item_str.lower() in gt_text.lower()
+    gt_text_folded = gt_text.casefold()
+    pred_text_folded = pred_text.casefold()
+    vocab_items = [str(vocab_item) for vocab_item in vocabulary_list]
+    vocab_keys = tuple(vocab_item_str.casefold() for vocab_item_str in vocab_items)
+
+    if AHOCORASICK_AVAILABLE and sum(1 for vocab_key in vocab_keys if vocab_key) >= VOCAB_AUTOMATON_MIN_SIZE:
+        # One pass per text finds every vocabulary item it contains; the empty
+        # string is a substring of any text, as with the `in` check.
+        automaton = _build_vocab_automaton(vocab_keys)
+        gt_hits = {vocab_key for _, vocab_key in automaton.iter(gt_text_folded)} | {""}
+        pred_hits = {vocab_key for _, vocab_key in automaton.iter(pred_text_folded)} | {""}
+    else:
+        gt_hits = pred_hits = None
+
+    for vocab_item_str, vocab_key in zip(vocab_items, vocab_keys):
+        gt_has_vocab = vocab_key in gt_hits if gt_hits is not None else vocab_key in gt_text_folded
         
         if gt_has_vocab:
             vocabs_in_gt.append(vocab_item_str)
-            pred_has_vocab = vocab_item_str.lower() in pred_text.lower()
+            pred_has_vocab = vocab_key in pred_hits if pred_hits is not None else vocab_key in pred_text_folded
             if pred_has_vocab:
                 vocabs_in_gt_and_pred.append(vocab_item_str)
                 logging.info(f"      Vocab: '{vocab_item_str}' | Found in GT: YES | Found in Pred: YES")
@@ -235,6 +316,12 @@ def calculate_vocabulary_accuracy(gt_text, pred_text, vocabulary_list, vtt_stem,
     return accuracy, vocabs_in_gt, vocabs_in_gt_and_pred
 
 
+def _content_char_mask(text):
+    """Returns a boolean array marking the characters of text that are neither whitespace nor punctuation."""
+    codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    return ~SEPARATOR_LOOKUP[np.minimum(codepoints, 0x10000)]
+
+
 def calculate_segmentation_accuracy(gt_segments, pred_text):
     """
     Calculates segmentation accuracy based on VTT segments and predicted text.
@@ -255,60 +342,54 @@ def calculate_segmentation_accuracy(gt_segments, pred_text):
     correctly_separated_boundaries = 0
     current_pred_char_idx = 0 
 
+    # pred_content_cumsum[k] is the number of content characters in pred_text[:k + 1], so the
+    # scan for the k-th content character after some position becomes a binary search.
+    pred_is_content = _content_char_mask(pred_text)
+    pred_content_cumsum = np.cumsum(pred_is_content)
+    pred_len = len(pred_text)
+
+    # Content character counts of every GT segment that ends a boundary, from one mask
+    # over their concatenation instead of one mask per segment.
+    boundary_segments = gt_segments[:num_gt_boundaries]
+    gt_segment_ends = np.cumsum([len(segment) for segment in boundary_segments])
+    gt_content_cumsum = np.concatenate(([0], np.cumsum(_content_char_mask(''.join(boundary_segments)))))
+    gt_content_counts = np.diff(gt_content_cumsum[gt_segment_ends], prepend=0).tolist()
     
     for i in range(num_gt_boundaries):
         gt_segment_to_map = gt_segments[i]
         
-        gt_content_chars_count = 0
-        for char_gt in gt_segment_to_map:
-            if not char_gt.isspace() and char_gt not in ALL_PUNCTUATION_CHARS:
-                gt_content_chars_count += 1
+        gt_content_chars_count = gt_content_counts[i]
         
         if gt_content_chars_count == 0:
-            logging.debug(f"GT segment '{gt_segment_to_map}' (index {i}) has 0 content characters. Skipping this boundary check for pred mapping.")
+            logging.debug("GT segment '%s' (index %d) has 0 content characters. Skipping this boundary check for pred mapping.", gt_segment_to_map, i)
             continue
 
-
-        
-        pred_content_chars_found = 0
-        
-        mapped_gt_segment_end_idx_in_pred = -1 
+        content_chars_before = int(pred_content_cumsum[current_pred_char_idx - 1]) if current_pred_char_idx > 0 else 0
+        mapped_gt_segment_end_idx_in_pred = int(np.searchsorted(
+            pred_content_cumsum, content_chars_before + gt_content_chars_count, side='left'
+        ))
         
-        temp_scan_idx = current_pred_char_idx
-        while temp_scan_idx < len(pred_text) and pred_content_chars_found < gt_content_chars_count:
-            char_pred = pred_text[temp_scan_idx]
-            
-            if not char_pred.isspace() and char_pred not in ALL_PUNCTUATION_CHARS:
-                pred_content_chars_found += 1
-            
-            
-            if pred_content_chars_found == gt_content_chars_count: 
-                mapped_gt_segment_end_idx_in_pred = temp_scan_idx
-                break
-            temp_scan_idx += 1
-        
-        
-        if pred_content_chars_found < gt_content_chars_count or mapped_gt_segment_end_idx_in_pred == -1:
-            logging.debug(f"Prediction text ended or insufficient content found while trying to map GT segment '{gt_segment_to_map}'.")
-            current_pred_char_idx = len(pred_text) 
+        if mapped_gt_segment_end_idx_in_pred >= pred_len:
+            logging.debug("Prediction text ended or insufficient content found while trying to map GT segment '%s'.", gt_segment_to_map)
+            current_pred_char_idx = pred_len 
             continue 
 
         
         separator_check_idx = mapped_gt_segment_end_idx_in_pred + 1
 
-        if separator_check_idx < len(pred_text):
+        if separator_check_idx < pred_len:
             potential_separator_char = pred_text[separator_check_idx]
             
-            if potential_separator_char.isspace() or potential_separator_char in ALL_PUNCTUATION_CHARS:
+            if not pred_is_content[separator_check_idx]:
                 correctly_separated_boundaries += 1
-                logging.debug(f"Boundary after GT '{gt_segment_to_map}' correctly separated in pred by '{potential_separator_char}'.")
+                logging.debug("Boundary after GT '%s' correctly separated in pred by '%s'.", gt_segment_to_map, potential_separator_char)
                 current_pred_char_idx = separator_check_idx + 1 
             else:
-                logging.debug(f"Boundary after GT '{gt_segment_to_map}' NOT separated. Found '{potential_separator_char}' in pred.")
+                logging.debug("Boundary after GT '%s' NOT separated. Found '%s' in pred.", gt_segment_to_map, potential_separator_char)
                 current_pred_char_idx = separator_check_idx 
         else:
-            logging.debug(f"Prediction ended exactly after mapping GT segment '{gt_segment_to_map}'. No separator found.")
-            current_pred_char_idx = len(pred_text)
+            logging.debug("Prediction ended exactly after mapping GT segment '%s'. No separator found.", gt_segment_to_map)
+            current_pred_char_idx = pred_len
 
     if num_gt_boundaries == 0 : 
         return "N/A"
@@ -316,50 +397,95 @@ def calculate_segmentation_accuracy(gt_segments, pred_text):
     return accuracy
 
 
-def _process_test_case_generic(base_test_set_dir, tc_folder_name, 
-                                    calculate_numbers_flag,
-                                    calculate_vocabulary_flag,
-                                    vocabulary_list_path=None):
+def _score_wer_batch(pending_wer_items):
     """
-    Generic function to process a test case folder (TC-1, TC-2, TC-3, TC-7).
-    Calculates metrics based on flags.
+    Scores (result_idx, label, pred_tokens, gt_tokens) items with a single ErrorRateStats tracker.
+    Returns (result_idx, wer_raw, wrr_raw) per item, WER in percent as reported by SpeechBrain.
     """
-    results_data = []
-    tc_path = os.path.join(base_test_set_dir, tc_folder_name)
+    if not pending_wer_items:
+        return []
 
-    if not os.path.isdir(tc_path):
-        logging.error(f"Test case folder not found: {tc_path}")
-        return pd.DataFrame()
+    # Imported on first use: speechbrain pulls in torch, which TC-4, TC-6 and the pipeline
+    # process itself never need.
+    from speechbrain.utils.metric_stats import ErrorRateStats
 
-    loaded_vocabulary = []
-    if calculate_vocabulary_flag and vocabulary_list_path:
-        try:
-            with open(vocabulary_list_path, 'r', encoding='utf-8') as f_vocab:
-                loaded_vocabulary = json.load(f_vocab)
-            if not isinstance(loaded_vocabulary, list) or not all(isinstance(item, str) for item in loaded_vocabulary):
-                logging.error(f"Vocabulary file {vocabulary_list_path} is not a list of strings. Disabling vocabulary processing for {tc_folder_name}.")
-                loaded_vocabulary = []
-            else:
-                logging.info(f"Successfully loaded {len(loaded_vocabulary)} vocabulary items from {vocabulary_list_path} for {tc_folder_name}.")
-        except Exception as e:
-            logging.error(f"Could not load or parse vocabulary file {vocabulary_list_path}: {e}. Disabling vocabulary processing for {tc_folder_name}.")
-            loaded_vocabulary = []
+    wer_tracker = ErrorRateStats()
+    # Stems repeat across language/noise folders, so ids are made unique by position.
+    wer_tracker.append(
+        ids=[f"{item_idx}_{label}" for item_idx, (_, label, _, _) in enumerate(pending_wer_items)],
+        predict=[pred_tokens for _, _, pred_tokens, _ in pending_wer_items],
+        target=[gt_tokens for _, _, _, gt_tokens in pending_wer_items]
+    )
 
-    files_to_process_meta = []
-    
-    for lang_folder_name in os.listdir(tc_path):
-        lang_full_path = os.path.join(tc_path, lang_folder_name)
-        if not os.path.isdir(lang_full_path):
-            logging.info(f"Skipping non-directory item: {lang_full_path} in {tc_folder_name}")
+    scored = []
+    for (result_idx, label, pred_tokens, _), score in zip(pending_wer_items, wer_tracker.scores):
+        wer_raw, wrr_raw = score.get('WER'), None
+        H, N_ref = score.get('hits'), score.get('num_ref_tokens')
+
+        if H is not None and N_ref is not None:
+            if N_ref > 0: wrr_raw = H / N_ref
+            elif N_ref == 0: wrr_raw = 1.0 if not pred_tokens else 0.0
+        elif wer_raw is not None:
+            wrr_raw = 1.0 - (wer_raw / 100.0) if wer_raw <=100 else 0.0
+        if wer_raw is not None and wrr_raw is None and N_ref is not None and N_ref > 0:
+            logging.warning(f"WRR could not be calculated for {label}. WER={wer_raw}, H={H}, N_ref={N_ref}.")
+        scored.append((result_idx, wer_raw, wrr_raw))
+    return scored
+
+
+def _list_vtt_prediction_pairs(scan_path):
+    """
+    Lists (vtt_name, vtt_stem, pred_name) for every '<vtt_stem>.*.txt' prediction next to a VTT,
+    from a single directory scan. VTTs and their predictions keep directory listing order.
+    """
+    vtt_entries = []
+    preds_by_stem = defaultdict(list)
+    with os.scandir(scan_path) as entries:
+        for entry in entries:
+            item_name = entry.name
+            if item_name.endswith(".vtt"):
+                vtt_entries.append((item_name, os.path.splitext(item_name)[0]))
+            if item_name.endswith(".txt"):
+                # Any prefix ending right before a '.' may be the stem of a VTT in this folder.
+                dot_idx = item_name.find(".")
+                while dot_idx != -1:
+                    preds_by_stem[item_name[:dot_idx]].append(item_name)
+                    dot_idx = item_name.find(".", dot_idx + 1)
+
+    return [
+        (item_name, vtt_stem, pred_item_name)
+        for item_name, vtt_stem in vtt_entries
+        for pred_item_name in preds_by_stem.get(vtt_stem, ())
+    ]
+
+
+def _scan_test_case_folder(base_test_set_dir, tc_folder_name):
+    """
+    Lists the folders of a test case that hold VTT/prediction pairs: the language folders, or for
+    TC-7 the noise level folders inside them. Returns a list of (scan_target, pairs), where
+    scan_target describes the folder and pairs come from _list_vtt_prediction_pairs.
+    """
+    tc_path = os.path.join(base_test_set_dir, tc_folder_name)
+    scanned_folders = []
+    with os.scandir(tc_path) as tc_entries:
+        lang_entries = list(tc_entries)
+    for lang_entry in lang_entries:
+        lang_folder_name = lang_entry.name
+        lang_full_path = lang_entry.path
+        if not lang_entry.is_dir():
+            logging.info("Skipping non-directory item: %s in %s", lang_full_path, tc_folder_name)
             continue
 
         paths_to_scan_for_files = []
         if tc_folder_name == "TC-7": 
-            logging.info(f"Scanning language folder for TC-7: {lang_full_path}")
-            for noise_folder_name in os.listdir(lang_full_path): 
-                noise_full_path = os.path.join(lang_full_path, noise_folder_name)
-                if os.path.isdir(noise_full_path):
-                    match = re.search(r"noisy_(\d+)", noise_folder_name, re.IGNORECASE)
+            logging.info("Scanning language folder for TC-7: %s", lang_full_path)
+            with os.scandir(lang_full_path) as lang_dir_entries:
+                noise_entries = list(lang_dir_entries)
+            for noise_entry in noise_entries: 
+                noise_folder_name = noise_entry.name
+                noise_full_path = noise_entry.path
+                if noise_entry.is_dir():
+                    match = NOISE_LEVEL_REGEX.search(noise_folder_name)
                     current_noise_level = f"{match.group(1)}%" if match else "Unknown"
                     paths_to_scan_for_files.append({
                         "path": noise_full_path, 
@@ -368,184 +494,309 @@ def _process_test_case_generic(base_test_set_dir, tc_folder_name,
                         "display_lang_sub_folder": os.path.join(lang_folder_name, noise_folder_name) 
                     })
         else: 
-            logging.info(f"Scanning language folder: {lang_full_path} for {tc_folder_name}")
+            logging.info("Scanning language folder: %s for %s", lang_full_path, tc_folder_name)
             paths_to_scan_for_files.append({
                 "path": lang_full_path, 
                 "noise": "N/A", 
                 "base_lang_folder": lang_folder_name,
                 "display_lang_sub_folder": lang_folder_name 
             })
-        
-        
+
         for scan_target in paths_to_scan_for_files:
-            current_scan_path = scan_target["path"]
-            for item_name in os.listdir(current_scan_path):
-                if item_name.endswith(".vtt"): 
-                    vtt_path = os.path.join(current_scan_path, item_name)
-                    vtt_stem, _ = os.path.splitext(item_name) 
-                    
-                    for pred_item_name in os.listdir(current_scan_path):
-                        
-                        if pred_item_name.startswith(vtt_stem + ".") and pred_item_name.endswith(".txt"):
-                            files_to_process_meta.append({
-                                "vtt_path": vtt_path,
-                                "pred_filename": pred_item_name,
-                                "base_lang_folder": scan_target["base_lang_folder"],
-                                "display_lang_sub_folder": scan_target["display_lang_sub_folder"],
-                                "current_scan_path": current_scan_path,
-                                "vtt_stem": vtt_stem,
-                                "noise_level": scan_target["noise"]
-                            })
+            scanned_folders.append((scan_target, _list_vtt_prediction_pairs(scan_target["path"])))
+    return scanned_folders
+
+
+def _build_file_index(base_test_set_dir, tc_folder_names):
+    """
+    Scans each existing test case folder once so that test cases sharing a folder
+    (TC-3/TC-5, and TC-4 with all of them) reuse one listing. Maps folder name to
+    the result of _scan_test_case_folder.
+    """
+    return {
+        tc_folder_name: _scan_test_case_folder(base_test_set_dir, tc_folder_name)
+        for tc_folder_name in tc_folder_names
+        if os.path.isdir(os.path.join(base_test_set_dir, tc_folder_name))
+    }
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a LOG_FILE_BUFFER_SIZE buffer instead of flushing every record.
+    The buffer is written out when full and on flush()/close() (logging.shutdown does both at exit);
+    callers flush it before starting worker processes so forked workers never inherit unwritten records.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        if self.stream is None:
+            # Closed; reopening in 'w' mode would truncate the log.
+            return
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+def _route_logging_to_queue(log_queue):
+    """Replaces the root handlers of a worker process with one that forwards records to the parent."""
+    root_logger = logging.getLogger()
+    root_logger.handlers = [QueueHandler(log_queue)]
+    root_logger.setLevel(logging.INFO)
+
+
+def _process_single_file(file_meta, tc_folder_name, calculate_numbers_flag, calculate_vocabulary_flag, vocabulary):
+    """
+    Computes one result row (ordered as GENERIC_RESULT_COLUMNS) of a generic test case inside a worker process.
+    Returns (row, wer_item); WER/WRR of rows with GT tokens are left for batch scoring
+    and wer_item carries (label, pred_tokens, gt_tokens) for it. Returns (None, None) for skipped files.
+    """
+    vtt_path = file_meta["vtt_path"]
+    pred_item_name = file_meta["pred_filename"]
+    base_lang_folder = file_meta["base_lang_folder"] 
+    display_lang_sub_folder = file_meta["display_lang_sub_folder"] 
+    current_scan_path = file_meta["current_scan_path"]
+    vtt_stem = file_meta["vtt_stem"]
+    noise_level_percent = file_meta["noise_level"]
+
     
-    for file_meta in tqdm(files_to_process_meta, desc=f"Processing {tc_folder_name}"):
-        vtt_path = file_meta["vtt_path"]
-        pred_item_name = file_meta["pred_filename"]
-        base_lang_folder = file_meta["base_lang_folder"] 
-        display_lang_sub_folder = file_meta["display_lang_sub_folder"] 
-        current_scan_path = file_meta["current_scan_path"]
-        vtt_stem = file_meta["vtt_stem"]
-        noise_level_percent = file_meta["noise_level"]
+    lang_parts = base_lang_folder.split('-') 
+    lang_short_code = lang_parts[0].lower() 
+    language_code_for_processing = "en" 
+    if lang_short_code in ["cantonese", "mandarin"]: language_code_for_processing = "zh"
+    elif lang_short_code == "english": language_code_for_processing = "en"
+    else: language_code_for_processing = lang_short_code 
+
+    gt_text = parse_vtt(vtt_path)
+    pred_txt_path = os.path.join(current_scan_path, pred_item_name)
+    pred_text = parse_txt(pred_txt_path)
+    
+    
+    # Pairs come from _list_vtt_prediction_pairs, so the name already starts with the stem.
+    method_match = STT_METHOD_SUFFIX_REGEX.fullmatch(pred_item_name, len(vtt_stem))
+    stt_method = method_match.group(1) if method_match else "unknown"
+    
+    if not stt_method or stt_method == "unknown":
+        logging.warning(f"Could not determine STT method for '{pred_item_name}' (VTT stem: '{vtt_stem}') in {current_scan_path}. Skipping.")
+        return None, None
+
+    wer_raw, wrr_raw, num_acc_raw, voc_acc_raw = None, None, None, None
+    wer_item = None
+    gt_numbers_extracted, pred_numbers_extracted = [], []
+    gt_vocabs_found, pred_vocabs_matched = [], []
+    folder_type_output = "General" 
 
+    
+    
+    if tc_folder_name == "TC-1" and calculate_numbers_flag and base_lang_folder.endswith("-Numbers"):
+        folder_type_output = "Numbers"
+        if not gt_text: logging.warning(f"Empty GT for VTT: {vtt_path} in Numbers folder.")
+        gt_numbers_extracted = extract_and_normalize_numbers(gt_text, language_code_for_processing)
+        pred_numbers_extracted = extract_and_normalize_numbers(pred_text, language_code_for_processing)
+        num_acc_raw = calculate_number_accuracy(gt_numbers_extracted, pred_numbers_extracted)
+    
+    
+    elif tc_folder_name == "TC-7":
+        folder_type_output = "NoiseTest"
+        if not gt_text: logging.warning(f"Empty GT text for VTT: {vtt_path} (TC-7). WER/WRR will be affected.")
+        gt_tokens = get_tokens_for_wer(gt_text, language_code_for_processing)
+        pred_tokens = get_tokens_for_wer(pred_text, language_code_for_processing)
+        if not gt_text and not gt_tokens: logging.info(f"GT text for {vtt_stem} ({vtt_path}) was empty or yielded no tokens.")
         
-        lang_parts = base_lang_folder.split('-') 
-        lang_short_code = lang_parts[0].lower() 
-        language_code_for_processing = "en" 
-        if lang_short_code in ["cantonese", "mandarin"]: language_code_for_processing = "zh"
-        elif lang_short_code == "english": language_code_for_processing = "en"
-        else: language_code_for_processing = lang_short_code 
-
-        gt_text = parse_vtt(vtt_path)
-        pred_txt_path = os.path.join(current_scan_path, pred_item_name)
-        pred_text = parse_txt(pred_txt_path)
+        if gt_tokens: 
+            wer_item = (f"{vtt_stem} (TC-7)", pred_tokens, gt_tokens)
+        elif not gt_tokens and not pred_tokens: 
+            wer_raw, wrr_raw = 0.0, 1.0
+        else: 
+            wer_raw, wrr_raw = 100.0, 0.0 
+    
+    
+    else: 
+        if tc_folder_name == "TC-1": folder_type_output = "Regular"
+        elif tc_folder_name == "TC-2": folder_type_output = "Accent"
+        elif tc_folder_name == "TC-3": folder_type_output = "Vocabulary"
         
+        if not gt_text: logging.warning(f"Empty GT text for VTT: {vtt_path}. WER/WRR will be affected.")
+        gt_tokens = get_tokens_for_wer(gt_text, language_code_for_processing)
+        pred_tokens = get_tokens_for_wer(pred_text, language_code_for_processing)
+        if not gt_text and not gt_tokens: logging.info(f"GT text for {vtt_stem} ({vtt_path}) was empty or yielded no tokens.")
+
+        if gt_tokens:
+            wer_item = (vtt_stem, pred_tokens, gt_tokens)
+        elif not gt_tokens and not pred_tokens: wer_raw, wrr_raw = 0.0, 1.0
+        else: wer_raw, wrr_raw = 100.0, 0.0
         
-        stt_method = "unknown"
-        expected_prefix = vtt_stem + "." 
-        if pred_item_name.startswith(expected_prefix) and pred_item_name.endswith(".txt"):
-            method_part = pred_item_name[len(expected_prefix):-len(".txt")]
-            stt_method = method_part
         
-        if not stt_method or stt_method == "unknown":
-            logging.warning(f"Could not determine STT method for '{pred_item_name}' (VTT stem: '{vtt_stem}') in {current_scan_path}. Skipping.")
+        if tc_folder_name == "TC-3" and calculate_vocabulary_flag and vocabulary:
+            voc_acc_raw, gt_vocabs_found, pred_vocabs_matched = calculate_vocabulary_accuracy(
+                gt_text, pred_text, vocabulary, vtt_stem, stt_method
+            )
+
+    
+    num_acc_out = f"{num_acc_raw*100:.2f}" if isinstance(num_acc_raw, (float, int)) else "N/A" 
+    voc_acc_out = f"{voc_acc_raw*100:.2f}" if isinstance(voc_acc_raw, float) else voc_acc_raw 
+
+
+    row = [
+        tc_folder_name,
+        display_lang_sub_folder, 
+        folder_type_output, 
+        noise_level_percent if tc_folder_name == "TC-7" else "N/A",
+        file_meta["vtt_filename"],
+        pred_item_name,
+        stt_method,
+        wer_raw, wrr_raw, 
+        num_acc_out, voc_acc_out,
+        "N/A", 
+        gt_text, pred_text,
+        ", ".join(gt_numbers_extracted) if gt_numbers_extracted else "",
+        ", ".join(pred_numbers_extracted) if pred_numbers_extracted else "",
+        ", ".join(gt_vocabs_found), 
+        ", ".join(pred_vocabs_matched) 
+    ]
+    return row, wer_item
+
+
+def _score_test_case_files(executor, tc_folder_name, files_to_process_meta,
+                           calculate_numbers_flag, calculate_vocabulary_flag, vocabulary):
+    """
+    Runs _process_single_file for every file of a generic test case on executor, then scores
+    WER/WRR of the collected rows in one batch, also on executor so that test cases coordinated
+    from threads of one process do not score under a shared GIL. Returns the results DataFrame.
+    """
+    # (results_data index, label, pred_tokens, gt_tokens) for rows whose WER/WRR is
+    # scored in one batch after all files are read.
+    pending_wer_items = []
+    results_data = [None] * len(files_to_process_meta)
+    process_file = partial(_process_single_file, tc_folder_name=tc_folder_name,
+                           calculate_numbers_flag=calculate_numbers_flag,
+                           calculate_vocabulary_flag=calculate_vocabulary_flag, vocabulary=vocabulary)
+    file_results = executor.map(process_file, files_to_process_meta, chunksize=FILE_TASK_CHUNKSIZE)
+    for file_idx, (row, wer_item) in enumerate(tqdm(file_results, total=len(files_to_process_meta), desc=f"Processing {tc_folder_name}")):
+        if row is None:
             continue
+        if wer_item is not None:
+            pending_wer_items.append((file_idx, *wer_item))
+        results_data[file_idx] = row
 
-        wer_raw, wrr_raw, num_acc_raw, voc_acc_raw = None, None, None, None
-        gt_numbers_extracted, pred_numbers_extracted = [], []
-        gt_vocabs_found, pred_vocabs_matched = [], []
-        folder_type_output = "General" 
+    for result_idx, wer_raw, wrr_raw in executor.submit(_score_wer_batch, pending_wer_items).result():
+        results_data[result_idx][WER_COLUMN_INDEX] = wer_raw
+        results_data[result_idx][WRR_COLUMN_INDEX] = wrr_raw
 
-        
-        
-        if tc_folder_name == "TC-1" and calculate_numbers_flag and base_lang_folder.endswith("-Numbers"):
-            folder_type_output = "Numbers"
-            if not gt_text: logging.warning(f"Empty GT for VTT: {vtt_path} in Numbers folder.")
-            gt_numbers_extracted = extract_and_normalize_numbers(gt_text, language_code_for_processing)
-            pred_numbers_extracted = extract_and_normalize_numbers(pred_text, language_code_for_processing)
-            num_acc_raw = calculate_number_accuracy(gt_numbers_extracted, pred_numbers_extracted)
-        
-        
-        elif tc_folder_name == "TC-7":
-            folder_type_output = "NoiseTest"
-            if not gt_text: logging.warning(f"Empty GT text for VTT: {vtt_path} (TC-7). WER/WRR will be affected.")
-            gt_tokens = get_tokens_for_wer(gt_text, language_code_for_processing)
-            pred_tokens = get_tokens_for_wer(pred_text, language_code_for_processing)
-            if not gt_text and not gt_tokens: logging.info(f"GT text for {vtt_stem} ({vtt_path}) was empty or yielded no tokens.")
-            
-            if gt_tokens: 
-                wer_tracker = ErrorRateStats()
-                wer_tracker.append(ids=[vtt_stem + "_" + stt_method], predict=[pred_tokens], target=[gt_tokens])
-                stats = wer_tracker.summarize() 
-                wer_raw = stats.get('error_rate') 
-                if wer_raw is None: wer_raw = stats.get('WER') 
-
-                H, N_ref = stats.get('hits'), stats.get('num_ref_tokens')
-                
-                if H is None and hasattr(wer_tracker, 'hits'): H = wer_tracker.hits
-                if N_ref is None and hasattr(wer_tracker, 'ref_tokens'): N_ref = wer_tracker.ref_tokens
-                
-                if H is not None and N_ref is not None:
-                    if N_ref > 0: wrr_raw = H / N_ref
-                    elif N_ref == 0: wrr_raw = 1.0 if not pred_tokens else 0.0 
-                elif wer_raw is not None: 
-                    
-                    
-                    wrr_raw = 1.0 - (wer_raw / 100.0) if wer_raw <=100 else 0.0 
-                
-                if wer_raw is not None and wrr_raw is None and N_ref is not None and N_ref > 0 : 
-                    logging.warning(f"WRR could not be calculated for {vtt_stem} (TC-7). WER={wer_raw}, H={H}, N_ref={N_ref}.")
+    results_data = [row for row in results_data if row is not None]
+    if not results_data:
+        return None
+    for row in results_data:
+        wer_raw, wrr_raw = row[WER_COLUMN_INDEX], row[WRR_COLUMN_INDEX]
+        row[WER_COLUMN_INDEX] = f"{wer_raw:.2f}" if isinstance(wer_raw, (float, int)) else "N/A"
+        row[WRR_COLUMN_INDEX] = f"{wrr_raw*100:.2f}" if isinstance(wrr_raw, (float, int)) else "N/A" 
+    results_df = pd.DataFrame.from_records(results_data, columns=GENERIC_RESULT_COLUMNS)
+    return results_df.astype(GENERIC_RESULT_CATEGORY_DTYPES)
 
-            elif not gt_tokens and not pred_tokens: 
-                wer_raw, wrr_raw = 0.0, 1.0
-            else: 
-                wer_raw, wrr_raw = 100.0, 0.0 
-        
-        
-        else: 
-            if tc_folder_name == "TC-1": folder_type_output = "Regular"
-            elif tc_folder_name == "TC-2": folder_type_output = "Accent"
-            elif tc_folder_name == "TC-3": folder_type_output = "Vocabulary"
-            
-            if not gt_text: logging.warning(f"Empty GT text for VTT: {vtt_path}. WER/WRR will be affected.")
-            gt_tokens = get_tokens_for_wer(gt_text, language_code_for_processing)
-            pred_tokens = get_tokens_for_wer(pred_text, language_code_for_processing)
-            if not gt_text and not gt_tokens: logging.info(f"GT text for {vtt_stem} ({vtt_path}) was empty or yielded no tokens.")
-
-            if gt_tokens:
-                wer_tracker = ErrorRateStats()
-                wer_tracker.append(ids=[vtt_stem + "_" + stt_method], predict=[pred_tokens], target=[gt_tokens])
-                stats = wer_tracker.summarize()
-                wer_raw = stats.get('error_rate', stats.get('WER')) 
-                H, N_ref = stats.get('hits'), stats.get('num_ref_tokens')
-                if H is None and hasattr(wer_tracker, 'hits'): H = wer_tracker.hits
-                if N_ref is None and hasattr(wer_tracker, 'ref_tokens'): N_ref = wer_tracker.ref_tokens
-
-                if H is not None and N_ref is not None:
-                    if N_ref > 0: wrr_raw = H / N_ref
-                    elif N_ref == 0: wrr_raw = 1.0 if not pred_tokens else 0.0
-                elif wer_raw is not None:
-                    wrr_raw = 1.0 - (wer_raw / 100.0) if wer_raw <=100 else 0.0
-                if wer_raw is not None and wrr_raw is None and N_ref is not None and N_ref > 0:
-                    logging.warning(f"WRR could not be calculated for {vtt_stem}. WER={wer_raw}, H={H}, N_ref={N_ref}.")
-            elif not gt_tokens and not pred_tokens: wer_raw, wrr_raw = 0.0, 1.0
-            else: wer_raw, wrr_raw = 100.0, 0.0
-            
-            
-            if tc_folder_name == "TC-3" and calculate_vocabulary_flag and loaded_vocabulary:
-                voc_acc_raw, gt_vocabs_found, pred_vocabs_matched = calculate_vocabulary_accuracy(
-                    gt_text, pred_text, loaded_vocabulary, vtt_stem, stt_method
-                )
 
-        
-        wer_out = f"{wer_raw:.2f}" if isinstance(wer_raw, (float, int)) else "N/A"
-        wrr_out = f"{wrr_raw*100:.2f}" if isinstance(wrr_raw, (float, int)) else "N/A" 
-        num_acc_out = f"{num_acc_raw*100:.2f}" if isinstance(num_acc_raw, (float, int)) else "N/A" 
-        voc_acc_out = f"{voc_acc_raw*100:.2f}" if isinstance(voc_acc_raw, float) else voc_acc_raw 
-
-
-        results_data.append({
-            "TestCase": tc_folder_name,
-            "LanguageSubFolder": display_lang_sub_folder, 
-            "FolderType": folder_type_output, 
-            "NoiseLevel_Percent": noise_level_percent if tc_folder_name == "TC-7" else "N/A",
-            "GroundTruthFile": os.path.basename(vtt_path),
-            "PredictionFile": pred_item_name,
-            "STT_Method": stt_method,
-            "WER": wer_out, "WRR_Percent": wrr_out, 
-            "NumberAccuracy_Percent": num_acc_out, "VocabularyAccuracy_Percent": voc_acc_out,
-            "ResponseSpeed_s": "N/A", 
-            "GT_Text_Raw": gt_text, "Pred_Text_Raw": pred_text,
-            "GT_Numbers_Extracted": ", ".join(gt_numbers_extracted) if gt_numbers_extracted else "",
-            "Pred_Numbers_Extracted": ", ".join(pred_numbers_extracted) if pred_numbers_extracted else "",
-            "GT_Vocabs_Found": ", ".join(gt_vocabs_found), 
-            "Pred_Vocabs_Matched": ", ".join(pred_vocabs_matched) 
-        })
-    return pd.DataFrame(results_data)
-
-
-def _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_dir_for_logs):
+def _process_test_case_generic(base_test_set_dir, tc_folder_name, 
+                                    calculate_numbers_flag,
+                                    calculate_vocabulary_flag,
+                                    vocabulary_list_path=None,
+                                    file_index=None,
+                                    executor=None):
+    """
+    Generic function to process a test case folder (TC-1, TC-2, TC-3, TC-7).
+    Calculates metrics based on flags. file_index (from _build_file_index) replaces the folder scan.
+    executor is a process pool whose workers route their logging to this process (the pipeline
+    shares one between all test cases); without it the test case starts its own.
+    """
+    tc_path = os.path.join(base_test_set_dir, tc_folder_name)
+
+    if not os.path.isdir(tc_path):
+        logging.error(f"Test case folder not found: {tc_path}")
+        return None
+
+    loaded_vocabulary = []
+    if calculate_vocabulary_flag and vocabulary_list_path:
+        try:
+            with open(vocabulary_list_path, 'r', encoding='utf-8') as f_vocab:
+                loaded_vocabulary = json.load(f_vocab)
+            if not isinstance(loaded_vocabulary, list) or not all(isinstance(item, str) for item in loaded_vocabulary):
+                logging.error(f"Vocabulary file {vocabulary_list_path} is not a list of strings. Disabling vocabulary processing for {tc_folder_name}.")
+                loaded_vocabulary = []
+            else:
+                logging.info(f"Successfully loaded {len(loaded_vocabulary)} vocabulary items from {vocabulary_list_path} for {tc_folder_name}.")
+        except Exception as e:
+            logging.error(f"Could not load or parse vocabulary file {vocabulary_list_path}: {e}. Disabling vocabulary processing for {tc_folder_name}.")
+            loaded_vocabulary = []
+
+    if file_index is not None and tc_folder_name in file_index:
+        scanned_folders = file_index[tc_folder_name]
+    else:
+        scanned_folders = _scan_test_case_folder(base_test_set_dir, tc_folder_name)
+
+    files_to_process_meta = []
+    for scan_target, pairs in scanned_folders:
+        current_scan_path = scan_target["path"]
+        for item_name, vtt_stem, pred_item_name in pairs:
+            files_to_process_meta.append({
+                "vtt_path": os.path.join(current_scan_path, item_name),
+                "vtt_filename": item_name,
+                "pred_filename": pred_item_name,
+                "base_lang_folder": scan_target["base_lang_folder"],
+                "display_lang_sub_folder": scan_target["display_lang_sub_folder"],
+                "current_scan_path": current_scan_path,
+                "vtt_stem": vtt_stem,
+                "noise_level": scan_target["noise"]
+            })
+    
+    if not files_to_process_meta:
+        logging.warning(f"No VTT/prediction pairs found for {tc_folder_name} under {tc_path}.")
+        return None
+
+    score_args = (tc_folder_name, files_to_process_meta, calculate_numbers_flag, calculate_vocabulary_flag, loaded_vocabulary)
+    if executor is not None:
+        return _score_test_case_files(executor, *score_args)
+
+    log_queue = multiprocessing.Queue()
+    log_listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    log_listener.start()
+    try:
+        with ProcessPoolExecutor(max_workers=os.cpu_count() or 1, initializer=_route_logging_to_queue,
+                                 initargs=(log_queue,)) as executor:
+            return _score_test_case_files(executor, *score_args)
+    finally:
+        log_listener.stop()
+
+
+def _read_segmentation_inputs(file_meta):
+    """Reads the GT segments and prediction text of one TC4 pair; runs on prefetch threads."""
+    gt_segments = get_vtt_segments(file_meta["vtt_path"])
+    pred_text = parse_txt(os.path.join(file_meta["current_scan_path"], file_meta["pred_filename"]))
+    return gt_segments, pred_text
+
+
+def _prefetch_segmentation_inputs(files_to_process_meta):
+    """
+    Yields the _read_segmentation_inputs of each TC4 pair in order, reading ahead on background
+    threads with at most FILE_PREFETCH_THREADS reads in flight (or done but not yet consumed).
+    """
+    remaining_meta = iter(files_to_process_meta)
+    with ThreadPoolExecutor(max_workers=FILE_PREFETCH_THREADS) as prefetch_pool:
+        pending_reads = deque(prefetch_pool.submit(_read_segmentation_inputs, file_meta)
+                              for file_meta in islice(remaining_meta, FILE_PREFETCH_THREADS))
+        while pending_reads:
+            segmentation_inputs = pending_reads.popleft().result()
+            next_meta = next(remaining_meta, None)
+            if next_meta is not None:
+                pending_reads.append(prefetch_pool.submit(_read_segmentation_inputs, next_meta))
+            yield segmentation_inputs
+
+
+def _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_dir_for_logs, file_index=None):
     """
     Processes data for Test Case 4 (Segmentation Accuracy).
     It iterates through specified test case folders (TC-1, TC-2, TC-3, TC-7) to find VTTs and their predictions.
+    file_index (from _build_file_index) replaces the folder scans.
     """
     results_data = []
     logging.info(f"TC4: Scanning for VTTs in {tc_folders_to_scan_for_vtts} under {base_test_set_dir}")
@@ -556,65 +807,38 @@ def _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_
             logging.warning(f"TC4: Source folder for segments not found: {tc_path}. Skipping.")
             continue
 
+        if file_index is not None and source_tc_folder in file_index:
+            scanned_folders = file_index[source_tc_folder]
+        else:
+            scanned_folders = _scan_test_case_folder(base_test_set_dir, source_tc_folder)
+
         files_to_process_meta = []
-        
-        for lang_folder_name in os.listdir(tc_path):
-            lang_full_path = os.path.join(tc_path, lang_folder_name)
-            if not os.path.isdir(lang_full_path): continue
-
-            paths_to_scan_for_files = []
-            if source_tc_folder == "TC-7": 
-                for noise_folder_name in os.listdir(lang_full_path):
-                    noise_full_path = os.path.join(lang_full_path, noise_folder_name)
-                    if os.path.isdir(noise_full_path):
-                        paths_to_scan_for_files.append({
-                            "path": noise_full_path,
-                            "base_lang_folder": lang_folder_name,
-                            "display_lang_sub_folder": os.path.join(lang_folder_name, noise_folder_name)
-                        })
-            else:
-                paths_to_scan_for_files.append({
-                    "path": lang_full_path,
-                    "base_lang_folder": lang_folder_name,
-                    "display_lang_sub_folder": lang_folder_name
+        for scan_target, pairs in scanned_folders:
+            current_scan_path = scan_target["path"]
+            for item_name, vtt_stem, pred_item_name in pairs:
+                files_to_process_meta.append({
+                    "vtt_path": os.path.join(current_scan_path, item_name),
+                    "vtt_filename": item_name,
+                    "pred_filename": pred_item_name,
+                    "base_lang_folder": scan_target["base_lang_folder"],
+                    "display_lang_sub_folder": scan_target["display_lang_sub_folder"],
+                    "current_scan_path": current_scan_path,
+                    "vtt_stem": vtt_stem,
+                    "source_tc_folder_vtt": source_tc_folder 
                 })
-            
-            for scan_target in paths_to_scan_for_files:
-                current_scan_path = scan_target["path"]
-                for item_name in os.listdir(current_scan_path):
-                    if item_name.endswith(".vtt"):
-                        vtt_path = os.path.join(current_scan_path, item_name)
-                        vtt_stem, _ = os.path.splitext(item_name)
-                        for pred_item_name in os.listdir(current_scan_path):
-                            if pred_item_name.startswith(vtt_stem + ".") and pred_item_name.endswith(".txt"):
-                                files_to_process_meta.append({
-                                    "vtt_path": vtt_path,
-                                    "pred_filename": pred_item_name,
-                                    "base_lang_folder": scan_target["base_lang_folder"],
-                                    "display_lang_sub_folder": scan_target["display_lang_sub_folder"],
-                                    "current_scan_path": current_scan_path,
-                                    "vtt_stem": vtt_stem,
-                                    "source_tc_folder_vtt": source_tc_folder 
-                                })
         
-        for file_meta in tqdm(files_to_process_meta, desc=f"TC4 processing VTTs from {source_tc_folder}"):
+        # Reads run ahead on prefetch threads while the loop computes segmentation accuracy.
+        prefetched_inputs = _prefetch_segmentation_inputs(files_to_process_meta)
+        for file_meta, (gt_segments, pred_text) in zip(tqdm(files_to_process_meta, desc=f"TC4 processing VTTs from {source_tc_folder}"), prefetched_inputs):
             vtt_path = file_meta["vtt_path"]
             pred_item_name = file_meta["pred_filename"]
             
             display_lang_sub_folder = file_meta["display_lang_sub_folder"]
-            current_scan_path = file_meta["current_scan_path"]
             vtt_stem = file_meta["vtt_stem"]
             source_tc_vtt = file_meta["source_tc_folder_vtt"] 
 
-            gt_segments = get_vtt_segments(vtt_path) 
-            pred_txt_path = os.path.join(current_scan_path, pred_item_name)
-            pred_text = parse_txt(pred_txt_path) 
-
-            stt_method = "unknown"
-            expected_prefix = vtt_stem + "."
-            if pred_item_name.startswith(expected_prefix) and pred_item_name.endswith(".txt"):
-                method_part = pred_item_name[len(expected_prefix):-len(".txt")]
-                stt_method = method_part
+            method_match = STT_METHOD_SUFFIX_REGEX.fullmatch(pred_item_name, len(vtt_stem))
+            stt_method = method_match.group(1) if method_match else "unknown"
             
             if not stt_method or stt_method == "unknown":
                 logging.warning(f"TC4: Could not determine STT method for '{pred_item_name}'. Skipping.")
@@ -638,7 +862,7 @@ def _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_
                 "TestCase": "TC-4", 
                 "SourceTestCaseVTT": source_tc_vtt, 
                 "LanguageSubFolder": display_lang_sub_folder, 
-                "GroundTruthFile": os.path.basename(vtt_path),
+                "GroundTruthFile": file_meta["vtt_filename"],
                 "PredictionFile": pred_item_name,
                 "STT_Method": stt_method,
                 "SegmentationAccuracy_Percent": seg_acc_out,
@@ -650,27 +874,69 @@ def _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_
                 
             })
             
-    return pd.DataFrame(results_data)
+    return pd.DataFrame(results_data) if results_data else None
+
 
+def _write_results_csv(results_df, output_path):
+    """
+    Writes results_df like to_csv(index=False, encoding='utf-8-sig'), letting pyarrow format
+    the columns when it is available. Falls back to pandas for frames Arrow cannot represent.
+    """
+    if PYARROW_AVAILABLE:
+        import pyarrow
+        import pyarrow.csv
+        try:
+            results_table = pyarrow.Table.from_pandas(results_df, preserve_index=False)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+            logging.info(f"Falling back to pandas CSV writer for {output_path}: {e}")
+        else:
+            with open(output_path, 'wb') as f_out:
+                f_out.write(codecs.BOM_UTF8)
+                pyarrow.csv.write_csv(results_table, f_out,
+                                      write_options=pyarrow.csv.WriteOptions(quoting_style="needed"))
+            return
+    results_df.to_csv(output_path, index=False, encoding='utf-8-sig')
 
-def testcase1(base_test_set_dir="testset"):
+
+def _concat_results(results_dfs):
+    """
+    Concatenates per test case results with LOW_CARDINALITY_RESULT_COLUMNS as categoricals.
+    Every frame is first aligned to the union of all columns (missing ones as NaN) and each
+    categorical column to the union of its categories, so pd.concat sees identical columns
+    and dtypes; it would otherwise fall back to object dtype when the categories differ.
+    """
+    all_columns = list(dict.fromkeys(column for results_df in results_dfs for column in results_df.columns))
+    category_dtypes = {}
+    for column in LOW_CARDINALITY_RESULT_COLUMNS:
+        column_values = [results_df[column] for results_df in results_dfs if column in results_df.columns]
+        if column_values:
+            categories = pd.unique(pd.concat([pd.Series(values.unique()).astype(object) for values in column_values]).dropna())
+            category_dtypes[column] = pd.CategoricalDtype(categories)
+    aligned_dfs = [results_df.reindex(columns=all_columns).astype(category_dtypes) for results_df in results_dfs]
+    return pd.concat(aligned_dfs, ignore_index=True)
+
+
+def testcase1(base_test_set_dir="testset", file_index=None, executor=None):
     return _process_test_case_generic(base_test_set_dir, "TC-1", 
                                         calculate_numbers_flag=True, 
-                                        calculate_vocabulary_flag=False)
+                                        calculate_vocabulary_flag=False,
+                                        file_index=file_index, executor=executor)
 
-def testcase2(base_test_set_dir="testset"):
+def testcase2(base_test_set_dir="testset", file_index=None, executor=None):
     return _process_test_case_generic(base_test_set_dir, "TC-2", 
                                         calculate_numbers_flag=False,
-                                        calculate_vocabulary_flag=False)
+                                        calculate_vocabulary_flag=False,
+                                        file_index=file_index, executor=executor)
 
-def testcase3(base_test_set_dir="testset", vocabulary_json_path="vocabulary.hsbc.json"):
+def testcase3(base_test_set_dir="testset", vocabulary_json_path="vocabulary.hsbc.json", file_index=None, executor=None):
     logging.info(f"Starting Test Case 3 processing. Data from 'TC-3' folder. Vocabulary from: {vocabulary_json_path}")
     return _process_test_case_generic(base_test_set_dir, "TC-3",
                                         calculate_numbers_flag=False,
                                         calculate_vocabulary_flag=True, 
-                                        vocabulary_list_path=vocabulary_json_path)
+                                        vocabulary_list_path=vocabulary_json_path,
+                                        file_index=file_index, executor=executor)
 
-def testcase4(base_test_set_dir="testset", output_dir_for_logs="test_case_logs"):
+def testcase4(base_test_set_dir="testset", output_dir_for_logs="test_case_logs", file_index=None):
     """
     Processes Test Case 4 for segmentation accuracy.
     Uses VTTs from other test case folders (TC-1, TC-2, TC-3, TC-7).
@@ -678,15 +944,16 @@ def testcase4(base_test_set_dir="testset", output_dir_for_logs="test_case_logs")
     logging.info(f"Starting Test Case 4 (Segmentation Accuracy) processing.")
     
     tc_folders_to_scan_for_vtts = ["TC-1", "TC-2", "TC-3", "TC-7"] 
-    return _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_dir_for_logs)
+    return _process_test_case_4(base_test_set_dir, tc_folders_to_scan_for_vtts, output_dir_for_logs, file_index=file_index)
 
-def testcase5(base_test_set_dir="testset", vocabulary_json_path="vocabulary.profanity.json"):
+def testcase5(base_test_set_dir="testset", vocabulary_json_path="vocabulary.profanity.json", file_index=None, executor=None):
     
     logging.info(f"Starting Test Case 5 processing: Using data from 'TC-3' folder with vocabulary from: {vocabulary_json_path}")
     return _process_test_case_generic(
         base_test_set_dir, "TC-3", 
         calculate_numbers_flag=False, calculate_vocabulary_flag=True,
-        vocabulary_list_path=vocabulary_json_path 
+        vocabulary_list_path=vocabulary_json_path,
+        file_index=file_index, executor=executor
     )
 
 def testcase6(api_durations_csv_path):
@@ -697,63 +964,61 @@ def testcase6(api_durations_csv_path):
     This function will attempt to parse 'PredictionFile' and 'STT_Method' from 'output_path'.
     """
     logging.info(f"--- Processing Test Case 6 (API Durations) from {api_durations_csv_path} ---")
-    durations_data = []
+    if PYARROW_AVAILABLE:
+        read_csv_kwargs = {"engine": "pyarrow", "dtype_backend": "pyarrow", "usecols": ['output_path', 'duration_seconds'],
+                           "dtype": {'output_path': 'string[pyarrow]', 'duration_seconds': 'double[pyarrow]'}}
+    else:
+        read_csv_kwargs = {"dtype": {'output_path': str, 'duration_seconds': float}}
     try:
-        
-        durations_df = pd.read_csv(api_durations_csv_path, dtype={'output_path': str, 'duration_seconds': float})
+        durations_df = pd.read_csv(api_durations_csv_path, **read_csv_kwargs)
     except FileNotFoundError:
         logging.error(f"API durations CSV file not found: {api_durations_csv_path}")
-        return pd.DataFrame()
+        return None
     except Exception as e:
         logging.error(f"Error reading API durations CSV {api_durations_csv_path}: {e}")
-        return pd.DataFrame()
+        return None
 
     if durations_df.empty:
         logging.warning(f"API durations CSV file is empty: {api_durations_csv_path}")
-        return pd.DataFrame()
+        return None
 
-    for _, row in durations_df.iterrows():
-        output_path_csv = row['output_path']
-        duration = row['duration_seconds']
+    valid_rows = durations_df['output_path'].notna() & durations_df['duration_seconds'].notna()
+    for output_path_csv, duration in durations_df.loc[~valid_rows, ['output_path', 'duration_seconds']].itertuples(index=False):
+        logging.warning(f"Skipping row with NaN data in durations CSV: output_path='{output_path_csv}', duration='{duration}'")
+    durations_df = durations_df[valid_rows]
 
-        if pd.isna(output_path_csv) or pd.isna(duration):
-            logging.warning(f"Skipping row with NaN data in durations CSV: output_path='{output_path_csv}', duration='{duration}'")
-            continue
-            
-        
-        output_path_csv_normalized = str(output_path_csv).replace('\\', '/')
-        prediction_file_name_from_csv = os.path.basename(output_path_csv_normalized) 
-        
-        parts = prediction_file_name_from_csv[:-len(".txt")].split('.')
-        stt_method_parsed_csv = "unknown"
-        
-        name_without_ext = prediction_file_name_from_csv[:-len(".txt")] if prediction_file_name_from_csv.endswith(".txt") else prediction_file_name_from_csv
-        stt_method_parsed_csv = name_without_ext.split('.')[-1] if '.' in name_without_ext and len(name_without_ext.split('.')) > 1 else name_without_ext 
-        
-        if not stt_method_parsed_csv or stt_method_parsed_csv == name_without_ext : 
-                logging.warning(f"Could not reliably parse STT method from '{prediction_file_name_from_csv}' in durations CSV. Using last part: '{stt_method_parsed_csv}'. This might cause merge issues if STT methods contain '.' or VTT stems are complex.")
-        
-        durations_data.append({
-            "PredictionFile": prediction_file_name_from_csv, 
-            "STT_Method": stt_method_parsed_csv, 
-            "ResponseSpeed_s_from_csv": f"{float(duration):.3f}" if isinstance(duration, (float, int)) else "N/A"
-        })
-    
-    if not durations_data:
+    # One regex extraction for both columns, which unlike split() also stays on Arrow
+    # string kernels when the CSV was read with pyarrow.
+    parsed_paths = durations_df['output_path'].str.extract(DURATION_OUTPUT_PATH_REGEX)
+    prediction_file_names = parsed_paths["PredictionFile"]
+    stt_methods = parsed_paths["STT_Method"]
+
+    # Without a prefix the method is the whole name (minus '.txt'), so it could not really be parsed.
+    unreliable_methods = (stt_methods == "") | parsed_paths["MethodPrefix"].isna()
+    for prediction_file_name_from_csv, stt_method_parsed_csv in zip(prediction_file_names[unreliable_methods], stt_methods[unreliable_methods]):
+        logging.warning(f"Could not reliably parse STT method from '{prediction_file_name_from_csv}' in durations CSV. Using last part: '{stt_method_parsed_csv}'. This might cause merge issues if STT methods contain '.' or VTT stems are complex.")
+
+    if durations_df.empty:
         logging.warning("No duration data successfully processed from CSV.")
-        return pd.DataFrame()
+        return None
 
+    durations_data = {
+        "PredictionFile": prediction_file_names.to_numpy(),
+        "STT_Method": stt_methods.to_numpy(),
+        "ResponseSpeed_s_from_csv": [f"{duration:.3f}" for duration in durations_df['duration_seconds'].to_numpy()]
+    }
     result_df = pd.DataFrame(durations_data)
     logging.info(f"Successfully processed {len(result_df)} duration entries from {api_durations_csv_path}.")
     
     result_df["TestCase"] = "TC-6" 
     return result_df
 
-def testcase7(base_test_set_dir="testset"):
+def testcase7(base_test_set_dir="testset", file_index=None, executor=None):
     logging.info(f"Starting Test Case 7 (Noise Level Test) processing. Data from 'TC-7' folder.")
     return _process_test_case_generic(base_test_set_dir, "TC-7",
                                         calculate_numbers_flag=False, 
-                                        calculate_vocabulary_flag=False) 
+                                        calculate_vocabulary_flag=False,
+                                        file_index=file_index, executor=executor) 
 
 
 def pipeline(base_test_set_dir="testset", output_dir="test_case_logs", 
@@ -769,219 +1034,196 @@ def pipeline(base_test_set_dir="testset", output_dir="test_case_logs",
     
     log_file_path = os.path.join(output_dir, 'stt_processing_details.log')
     
-    logging.basicConfig(filename=log_file_path, level=logging.INFO,
-                        format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s', filemode='w')
+    log_file_handler = _BufferedFileHandler(log_file_path, mode='w')
+    logging.basicConfig(handlers=[log_file_handler], level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s', force=True)
     print(f"Logging details (including INFO level for vocabulary and merge diagnostics) to: {log_file_path}")
     logging.info("STT Comparison Pipeline Started.")
 
-    all_results_dfs = [] 
-
-    
-    print("\nProcessing Test Case 1...")
-    logging.info("--- Processing Test Case 1 ---")
-    tc1_results_df = testcase1(base_test_set_dir)
-    if not tc1_results_df.empty:
-        output_path_tc1 = os.path.join(output_dir, "stt_comparison_tc1_results.csv")
-        try:
-            tc1_results_df.to_csv(output_path_tc1, index=False, encoding='utf-8-sig')
-            print(f"TC-1 results saved to: {output_path_tc1}")
-            logging.info(f"TC-1 results saved to: {output_path_tc1}")
-            all_results_dfs.append(tc1_results_df)
-        except Exception as e:
-            print(f"Error saving TC-1 results: {e}")
-            logging.error(f"Error saving TC-1 results to {output_path_tc1}: {e}")
-    else:
-        print("No results for TC-1 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-1.")
-
-    
-    print("\nProcessing Test Case 2...")
-    logging.info("--- Processing Test Case 2 ---")
-    tc2_results_df = testcase2(base_test_set_dir)
-    if not tc2_results_df.empty:
-        output_path_tc2 = os.path.join(output_dir, "stt_comparison_tc2_results.csv")
-        try:
-            tc2_results_df.to_csv(output_path_tc2, index=False, encoding='utf-8-sig')
-            print(f"TC-2 results saved to: {output_path_tc2}")
-            logging.info(f"TC-2 results saved to: {output_path_tc2}")
-            all_results_dfs.append(tc2_results_df)
-        except Exception as e:
-            print(f"Error saving TC-2 results: {e}")
-            logging.error(f"Error saving TC-2 results to {output_path_tc2}: {e}")
-    else:
-        print("No results for TC-2 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-2.")
-
-    
-    print("\nProcessing Test Case 3 (HSBC Vocabulary)...")
-    logging.info("--- Processing Test Case 3 (HSBC Vocabulary) ---")
-    tc3_results_df = testcase3(base_test_set_dir, vocabulary_json_path=hsbc_vocabulary_file)
-    if not tc3_results_df.empty:
-        output_path_tc3 = os.path.join(output_dir, "stt_comparison_tc3_results.csv")
-        try:
-            tc3_results_df.to_csv(output_path_tc3, index=False, encoding='utf-8-sig')
-            print(f"TC-3 results (HSBC vocab) saved to: {output_path_tc3}")
-            logging.info(f"TC-3 results (HSBC vocab) saved to: {output_path_tc3}")
-            all_results_dfs.append(tc3_results_df)
-        except Exception as e:
-            print(f"Error saving TC-3 results: {e}")
-            logging.error(f"Error saving TC-3 results to {output_path_tc3}: {e}")
-    else:
-        print("No results for TC-3 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-3.")
-
-    
-    print("\nProcessing Test Case 4 (Segmentation Accuracy)...")
-    logging.info("--- Processing Test Case 4 (Segmentation Accuracy) ---")
-    tc4_results_df = testcase4(base_test_set_dir, output_dir_for_logs=output_dir)
-    if not tc4_results_df.empty:
-        output_path_tc4 = os.path.join(output_dir, "stt_comparison_tc4_results.csv")
-        try:
-            tc4_results_df.to_csv(output_path_tc4, index=False, encoding='utf-8-sig')
-            print(f"TC-4 results saved to: {output_path_tc4}")
-            logging.info(f"TC-4 results saved to: {output_path_tc4}")
-            all_results_dfs.append(tc4_results_df) 
-        except Exception as e:
-            print(f"Error saving TC-4 results: {e}")
-            logging.error(f"Error saving TC-4 results to {output_path_tc4}: {e}")
-    else:
-        print("No results for TC-4 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-4.")
-
-    
-    print("\nProcessing Test Case 5 (TC-3 data with Profanity Vocabulary)...")
-    logging.info("--- Processing Test Case 5 (TC-3 data with Profanity Vocabulary) ---")
-    tc5_results_df = testcase5(base_test_set_dir, vocabulary_json_path=profanity_vocabulary_file) 
-    if not tc5_results_df.empty:
-        
-        tc5_results_df["TestCase"] = "TC-5" 
-        output_path_tc5 = os.path.join(output_dir, "stt_comparison_tc5_results.csv")
-        try:
-            tc5_results_df.to_csv(output_path_tc5, index=False, encoding='utf-8-sig')
-            print(f"TC-5 results (TC-3 data, profanity vocab, labeled as TC-5) saved to: {output_path_tc5}")
-            logging.info(f"TC-5 results (TC-3 data, profanity vocab, labeled as TC-5) saved to: {output_path_tc5}")
-            all_results_dfs.append(tc5_results_df)
-        except Exception as e:
-            print(f"Error saving TC-5 results: {e}")
-            logging.error(f"Error saving TC-5 results to {output_path_tc5}: {e}")
-    else:
-        print("No results for TC-5 (TC-3 data, profanity vocab) or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-5 (TC-3 data, profanity vocab).")
-
-    
-    print("\nProcessing Test Case 7 (Noise Level Test)...")
-    logging.info("--- Processing Test Case 7 (Noise Level Test) ---")
-    tc7_results_df = testcase7(base_test_set_dir)
-    if not tc7_results_df.empty:
-        output_path_tc7 = os.path.join(output_dir, "stt_comparison_tc7_results.csv")
-        try:
-            tc7_results_df.to_csv(output_path_tc7, index=False, encoding='utf-8-sig')
-            print(f"TC-7 results saved to: {output_path_tc7}")
-            logging.info(f"TC-7 results saved to: {output_path_tc7}")
-            all_results_dfs.append(tc7_results_df)
-        except Exception as e:
-            print(f"Error saving TC-7 results: {e}")
-            logging.error(f"Error saving TC-7 results to {output_path_tc7}: {e}")
-    else:
-        print("No results for TC-7 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-7.")
-
-    
-    
-    print("\nProcessing Test Case 6 (API Durations)...")
-    logging.info(f"--- Processing Test Case 6 (API Durations) from: {api_durations_csv_file_path} ---")
-    tc6_durations_df = testcase6(api_durations_csv_file_path) 
-    if not tc6_durations_df.empty:
-        output_path_tc6_standalone = os.path.join(output_dir, "stt_comparison_tc6_results.csv")
-        try:
-            
-            tc6_durations_df.to_csv(output_path_tc6_standalone, index=False, encoding='utf-8-sig')
-            print(f"TC-6 raw extracted API duration data saved to: {output_path_tc6_standalone}")
-            logging.info(f"TC-6 raw extracted API duration data saved to: {output_path_tc6_standalone}")
-        except Exception as e:
-            print(f"Error saving standalone TC-6 extracted data: {e}")
-            logging.error(f"Error saving standalone TC-6 extracted data to {output_path_tc6_standalone}: {e}")
-    else:
-        print("No API duration data processed for TC-6 or error occurred. Check logs.")
-        logging.warning("No results dataframe generated for TC-6 (API Durations). tc6_durations_df is empty.")
+    # (label, function, kwargs, results file, description) of the test cases merged into the
+    # combined report, in report order; they are independent and run side by side.
+    test_case_specs = [
+        ("TC-1", testcase1, {"base_test_set_dir": base_test_set_dir}, "stt_comparison_tc1_results.csv", "TC-1 results"),
+        ("TC-2", testcase2, {"base_test_set_dir": base_test_set_dir}, "stt_comparison_tc2_results.csv", "TC-2 results"),
+        ("TC-3", testcase3, {"base_test_set_dir": base_test_set_dir, "vocabulary_json_path": hsbc_vocabulary_file},
+         "stt_comparison_tc3_results.csv", "TC-3 results (HSBC vocab)"),
+        ("TC-4", testcase4, {"base_test_set_dir": base_test_set_dir, "output_dir_for_logs": output_dir},
+         "stt_comparison_tc4_results.csv", "TC-4 results"),
+        ("TC-5", testcase5, {"base_test_set_dir": base_test_set_dir, "vocabulary_json_path": profanity_vocabulary_file},
+         "stt_comparison_tc5_results.csv", "TC-5 results (TC-3 data, profanity vocab, labeled as TC-5)"),
+        ("TC-7", testcase7, {"base_test_set_dir": base_test_set_dir}, "stt_comparison_tc7_results.csv", "TC-7 results"),
+    ]
+    results_by_label = {}
+    tc6_durations_df = None
+
+    # Every test case folder is listed once here and the listing is shared by all test cases.
+    file_index = _build_file_index(base_test_set_dir, ("TC-1", "TC-2", "TC-3", "TC-7"))
+
+    log_queue = multiprocessing.Queue()
+    log_listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    log_listener.start()
+    # Per test case CSVs are written on background threads so formatting them overlaps
+    # with the test cases still running; all writes finish before the combined report.
+    write_futures = {}
+    try:
+        # All test cases share one full-size process pool, so the cores of a test case that
+        # finishes early go to those still running. TC-4 and TC-6 run on it as single tasks;
+        # the generic test cases fan their files out to it from coordinator threads.
+        with ThreadPoolExecutor(max_workers=RESULT_WRITER_THREADS) as csv_writer, \
+                ProcessPoolExecutor(max_workers=os.cpu_count() or 1, initializer=_route_logging_to_queue,
+                                    initargs=(log_queue,)) as executor, \
+                ThreadPoolExecutor(max_workers=len(test_case_specs)) as test_case_runner:
+            futures = {}
+            print("\nProcessing Test Case 6 (API Durations)...")
+            logging.info(f"--- Processing Test Case 6 (API Durations) from: {api_durations_csv_file_path} ---")
+            # With fork the first submit starts every pool worker. It happens here, before any
+            # coordinator thread logs, and right after a flush so no worker inherits buffered records.
+            log_file_handler.flush()
+            futures[executor.submit(testcase6, api_durations_csv_file_path)] = (
+                "TC-6", "stt_comparison_tc6_results.csv", "TC-6 raw extracted API duration data")
+            for label, test_case_func, test_case_kwargs, results_file, description in test_case_specs:
+                print(f"\nProcessing Test Case {label[3:]}...")
+                logging.info(f"--- Processing Test Case {label[3:]} ---")
+                if label == "TC-4":
+                    test_case_future = executor.submit(test_case_func, **test_case_kwargs, file_index=file_index)
+                else:
+                    test_case_future = test_case_runner.submit(test_case_func, **test_case_kwargs,
+                                                               file_index=file_index, executor=executor)
+                futures[test_case_future] = (label, results_file, description)
+
+            for future in as_completed(futures):
+                label, results_file, description = futures[future]
+                try:
+                    results_df = future.result()
+                except Exception as e:
+                    print(f"Error processing {label}: {e}")
+                    logging.error(f"Error processing {label}: {e}")
+                    continue
+
+                if results_df is None:
+                    if label == "TC-6":
+                        print("No API duration data processed for TC-6 or error occurred. Check logs.")
+                        logging.warning("No results dataframe generated for TC-6 (API Durations). tc6_durations_df is empty.")
+                    else:
+                        print(f"No results for {label} or error occurred. Check logs.")
+                        logging.warning(f"No results dataframe generated for {label}.")
+                    continue
+
+                if label == "TC-6":
+                    tc6_durations_df = results_df
+                else:
+                    if label == "TC-5":
+                        # testcase5 reuses the TC-3 folder, so its rows come back labeled TC-3.
+                        results_df["TestCase"] = "TC-5"
+                    results_by_label[label] = results_df
+                output_path = os.path.join(output_dir, results_file)
+                write_futures[csv_writer.submit(_write_results_csv, results_df, output_path)] = (label, output_path, description)
+
+            for write_future in as_completed(write_futures):
+                label, output_path, description = write_futures[write_future]
+                try:
+                    write_future.result()
+                    print(f"{description} saved to: {output_path}")
+                    logging.info("%s saved to: %s", description, output_path)
+                except Exception as e:
+                    print(f"Error saving {label} results: {e}")
+                    logging.error(f"Error saving {label} results to {output_path}: {e}")
+    finally:
+        log_listener.stop()
+
+    # Combine in report order rather than completion order so the output is deterministic.
+    all_results_dfs = [results_by_label[label] for label, *_ in test_case_specs if label in results_by_label]
 
 
     
     combined_results_df = None 
     if all_results_dfs: 
-        combined_results_df = pd.concat(all_results_dfs, ignore_index=True)
+        combined_results_df = _concat_results(all_results_dfs)
         logging.info(f"Combined results from TC1-TC5, TC7 created with {len(combined_results_df)} rows before TC6 merge.")
         
         
         if 'ResponseSpeed_s' not in combined_results_df.columns:
             combined_results_df['ResponseSpeed_s'] = "N/A"
-        initial_speeds_populated = combined_results_df[combined_results_df['ResponseSpeed_s'] != "N/A"].shape[0]
+        initial_speeds_populated = int(np.count_nonzero(combined_results_df['ResponseSpeed_s'].to_numpy(dtype=object) != "N/A"))
 
-        if not tc6_durations_df.empty:
+        if tc6_durations_df is not None:
             logging.info(f"Attempting to merge {len(tc6_durations_df)} duration entries from TC6 into main results ({len(combined_results_df)} rows).")
             logging.info(f"Merge keys: ['PredictionFile', 'STT_Method']")
             
             
-            logging.info(f"Pre-merge: combined_results_df shape: {combined_results_df.shape}")
-            if not combined_results_df.empty:
-                logging.info(f"Sample keys from combined_results_df (first 5 rows, relevant columns for merge):\n{combined_results_df[['TestCase', 'PredictionFile', 'STT_Method']].head().to_string()}")
+            logging.info("Pre-merge: combined_results_df shape: %s", combined_results_df.shape)
+            # The sample dumps render frames to text, so they are DEBUG records built only when emitted.
+            log_samples = logging.getLogger().isEnabledFor(logging.DEBUG)
+            if log_samples and not combined_results_df.empty:
+                logging.debug("Sample keys from combined_results_df (first 5 rows, relevant columns for merge):\n%s", combined_results_df[['TestCase', 'PredictionFile', 'STT_Method']].head().to_string())
             
-            logging.info(f"Pre-merge: tc6_durations_df shape: {tc6_durations_df.shape}")
-            if not tc6_durations_df.empty:
-                logging.info(f"Sample keys from tc6_durations_df (first 5 rows, relevant columns for merge):\n{tc6_durations_df[['PredictionFile', 'STT_Method', 'ResponseSpeed_s_from_csv']].head().to_string()}")
+            logging.info("Pre-merge: tc6_durations_df shape: %s", tc6_durations_df.shape)
+            if log_samples:
+                logging.debug("Sample keys from tc6_durations_df (first 5 rows, relevant columns for merge):\n%s", tc6_durations_df[['PredictionFile', 'STT_Method', 'ResponseSpeed_s_from_csv']].head().to_string())
 
             
             
             
-            merged_df_with_indicator = pd.merge(
-                combined_results_df, 
-                tc6_durations_df.drop(columns=['TestCase'], errors='ignore'), 
-                on=["PredictionFile", "STT_Method"], 
-                how="left",
-                indicator=True 
-            )
-            logging.info(f"Post-merge: merged_df_with_indicator shape: {merged_df_with_indicator.shape}")
-            
-            merge_counts = merged_df_with_indicator['_merge'].value_counts()
-            logging.info(f"Merge indicator counts ('_merge' column):\n{merge_counts.to_string()}")
-            
-            successful_merges = merge_counts.get('both', 0) 
-            left_only_merges = merge_counts.get('left_only',0) 
+            # Look the durations up by key instead of left-merging, so no merged copy of the combined
+            # frame is built. The lookup needs unique keys; a file timed more than once keeps its
+            # last (most recent) duration.
+            # Both key columns are factorized over TC6 and combined rows together, so each
+            # (PredictionFile, STT_Method) pair becomes one int64 and the lookup hashes integers
+            # rather than strings. The first len(tc6_durations_df) keys belong to TC6.
+            num_tc6_rows = len(tc6_durations_df)
+            prediction_file_codes, _ = pd.factorize(pd.concat(
+                [tc6_durations_df["PredictionFile"].astype(object), combined_results_df["PredictionFile"].astype(object)], ignore_index=True
+            ), use_na_sentinel=False)
+            stt_method_codes, stt_method_uniques = pd.factorize(pd.concat(
+                [tc6_durations_df["STT_Method"].astype(object), combined_results_df["STT_Method"].astype(object)], ignore_index=True
+            ), use_na_sentinel=False)
+            merge_key_codes = prediction_file_codes.astype(np.int64) * len(stt_method_uniques) + stt_method_codes
+
+            tc6_speeds = tc6_durations_df["ResponseSpeed_s_from_csv"].to_numpy(dtype=object)
+            tc6_key_index = pd.Index(merge_key_codes[:num_tc6_rows])
+            duplicate_keys = tc6_key_index.duplicated(keep='last')
+            if duplicate_keys.any():
+                duplicate_key_pairs = tc6_durations_df.loc[duplicate_keys, ["PredictionFile", "STT_Method"]].drop_duplicates()
+                logging.warning(f"TC6 durations contain {int(np.count_nonzero(duplicate_keys))} duplicate ('PredictionFile', 'STT_Method') entries. "
+                                f"Keeping the last duration for each: {list(duplicate_key_pairs.itertuples(index=False, name=None))}")
+                tc6_key_index = tc6_key_index[~duplicate_keys]
+                tc6_speeds = tc6_speeds[~duplicate_keys]
+            lookup_positions = tc6_key_index.get_indexer(merge_key_codes[num_tc6_rows:])
+            has_match = lookup_positions >= 0
+
+            successful_merges = int(np.count_nonzero(has_match))
+            left_only_merges = len(has_match) - successful_merges
+            logging.info(f"Duration lookup matches: both={successful_merges}, left_only={left_only_merges}")
 
             logging.info(f"Number of rows in combined_results_df that successfully merged with TC6 data (found a match): {successful_merges}")
             logging.info(f"Number of rows in combined_results_df that did NOT find a match in TC6 data: {left_only_merges}")
 
-            if successful_merges == 0 and not tc6_durations_df.empty and not combined_results_df.empty :
+            if successful_merges == 0 and not combined_results_df.empty :
                 logging.warning("TC6 MERGE DIAGNOSTIC: No rows from tc6_durations_df matched any rows in combined_results_df. "
                                 "This means 'ResponseSpeed_s' could not be updated from TC6 data. "
                                 "Critical Check Needed: 'PredictionFile' and 'STT_Method' values must be *exactly identical* between the TC6 CSV data "
                                 "(see 'stt_comparison_tc6_durations_extracted.csv') and the main test case results (e.g., 'stt_comparison_tc1_results.csv'). "
                                 "Verify consistent filename parsing and STT method naming conventions.")
-            
-            combined_results_df = merged_df_with_indicator.drop(columns=['_merge']) 
 
-            
-            if 'ResponseSpeed_s_from_csv' in combined_results_df.columns:
-                combined_results_df['ResponseSpeed_s'] = combined_results_df['ResponseSpeed_s_from_csv'].combine_first(combined_results_df['ResponseSpeed_s'])
-                combined_results_df.drop(columns=['ResponseSpeed_s_from_csv'], inplace=True)
-                
-                final_speeds_populated = combined_results_df[combined_results_df['ResponseSpeed_s'] != "N/A"].shape[0]
-                num_updated_by_tc6 = final_speeds_populated - initial_speeds_populated
-                logging.info(f"'ResponseSpeed_s' column updated. {num_updated_by_tc6} rows had their speed value newly populated or changed by TC6 data.")
-                if num_updated_by_tc6 == 0 and successful_merges > 0:
-                        logging.warning("TC6 MERGE DIAGNOSTIC: Merge indicated matches, but no 'ResponseSpeed_s' values were actually changed. "
-                                        "This could happen if all matched TC6 rows had 'N/A' for 'ResponseSpeed_s_from_csv' or if the original 'ResponseSpeed_s' was already populated and identical.")
-            else:
-                
-                
-                logging.warning("After attempting to merge TC6 data, the 'ResponseSpeed_s_from_csv' column was not found in the merged DataFrame. "
-                                "Durations from TC6 may not have been correctly integrated. Check tc6_durations_df structure.")
+            # A single select between the looked-up and current speeds (no copy-and-patch of
+            # the column); unmatched rows index position 0 but are masked out.
+            looked_up_speeds = tc6_speeds[np.where(has_match, lookup_positions, 0)]
+            updated_speeds = np.where(has_match & pd.notna(looked_up_speeds), looked_up_speeds,
+                                      combined_results_df['ResponseSpeed_s'].to_numpy(dtype=object))
+            combined_results_df['ResponseSpeed_s'] = updated_speeds
+
+            final_speeds_populated = int(np.count_nonzero(updated_speeds != "N/A"))
+            num_updated_by_tc6 = final_speeds_populated - initial_speeds_populated
+            logging.info(f"'ResponseSpeed_s' column updated. {num_updated_by_tc6} rows had their speed value newly populated or changed by TC6 data.")
+            if num_updated_by_tc6 == 0 and successful_merges > 0:
+                    logging.warning("TC6 MERGE DIAGNOSTIC: Merge indicated matches, but no 'ResponseSpeed_s' values were actually changed. "
+                                    "This could happen if all matched TC6 rows had 'N/A' for 'ResponseSpeed_s_from_csv' or if the original 'ResponseSpeed_s' was already populated and identical.")
         else: 
             logging.info("No TC6 duration data (tc6_durations_df is empty) to merge with other test case results.")
             if 'ResponseSpeed_s' not in combined_results_df.columns: 
                 combined_results_df['ResponseSpeed_s'] = "N/A"
             
-    elif not tc6_durations_df.empty: 
+    elif tc6_durations_df is not None: 
         logging.warning("Only TC6 duration data was generated (no results from TC1-5, TC7). The combined report will only contain this TC6 data.")
         
         combined_results_df = tc6_durations_df.rename(columns={"ResponseSpeed_s_from_csv": "ResponseSpeed_s"})
@@ -1001,11 +1243,12 @@ def pipeline(base_test_set_dir="testset", output_dir="test_case_logs",
     else: 
         print("\nNo results generated from any test case (TC1-5, TC7, or TC6). Cannot create combined report.")
         logging.error("STT Comparison Pipeline Finished: No data from any test case to save.")
+        log_file_handler.flush()
         return 
 
     
     if combined_results_df is not None and not combined_results_df.empty:
-        logging.info(f"Final combined DataFrame for saving has {len(combined_results_df)} rows and columns: {combined_results_df.columns.tolist()}")
+        logging.info("Final combined DataFrame for saving has %d rows and columns: %s", len(combined_results_df), combined_results_df.columns.tolist())
         
         
         cols_order = [
@@ -1019,20 +1262,13 @@ def pipeline(base_test_set_dir="testset", output_dir="test_case_logs",
         ]
         
         
-        for col in cols_order:
-            if col not in combined_results_df.columns:
-                combined_results_df[col] = "N/A" 
-
-        
-        present_cols_in_order = [col for col in cols_order if col in combined_results_df.columns]
-        additional_cols = sorted([col for col in combined_results_df.columns if col not in present_cols_in_order])
-        final_ordered_columns = present_cols_in_order + additional_cols
-        
-        combined_results_df = combined_results_df[final_ordered_columns]
+        # Missing report columns are added as "N/A" and everything is reordered in one reindex.
+        additional_cols = sorted([col for col in combined_results_df.columns if col not in cols_order])
+        combined_results_df = combined_results_df.reindex(columns=cols_order + additional_cols, fill_value="N/A")
 
         output_path_combined = os.path.join(output_dir, "stt_comparison_all_tc_results.csv")
         try:
-            combined_results_df.to_csv(output_path_combined, index=False, encoding='utf-8-sig')
+            _write_results_csv(combined_results_df, output_path_combined)
             print(f"\nAll test case results combined and saved to: {output_path_combined}")
             logging.info(f"All test case results combined and saved to: {output_path_combined}. Final shape: {combined_results_df.shape}")
         except Exception as e:
@@ -1044,6 +1280,7 @@ def pipeline(base_test_set_dir="testset", output_dir="test_case_logs",
 
     print("\nPipeline finished.")
     logging.info("STT Comparison Pipeline Finished.")
+    log_file_handler.flush()
 
 if __name__ == "__main__":
     print("Attempting to run STT comparison pipeline.")
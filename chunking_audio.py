@@ -1,12 +1,40 @@
 import os
-from pydub import AudioSegment
-import glob
+import re
+import sys
+import subprocess
 import multiprocessing
-from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from collections import defaultdict
 import time
-import traceback
+import logging
+from logging.handlers import QueueHandler, QueueListener
 from tqdm import tqdm
 
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+# Upper bound on chunk outputs handed to one ffmpeg invocation, keeping the command line
+# well under the Windows 32k character limit for long sources with short chunk sizes.
+FFMPEG_MAX_OUTPUTS_PER_CALL = 200
+# ffmpeg batches of one source run side by side; each thread just waits on its subprocess.
+FFMPEG_BATCH_THREADS = 3
+# Threads listing video folders concurrently during audio file discovery.
+DIRECTORY_SCAN_THREADS = 16
+VTT_TIME_FORMAT = "%02d:%02d:%02d.%03d"
+# One or more whitespace-only lines between cue blocks (input is newline-normalized first).
+VTT_BLOCK_SEPARATOR_REGEX = re.compile(r"\n(?:[^\S\n]*\n)+")
+
+# Worker log records are forwarded to the parent and written there by a single handler.
+WORKER_LOG_FORMAT = "[PID %(process)d] %(levelname)s: %(message)s"
+
+# Run-wide chunking settings, set once per worker process by _init_chunking_worker.
+_worker_config = {}
+
+@lru_cache(maxsize=1 << 16)
 def vtt_time_to_ms(vtt_time_str):
     parts = vtt_time_str.split(':')
     h, m, s_ms_val = 0, 0, ""
@@ -30,156 +58,228 @@ def vtt_time_to_ms(vtt_time_str):
 
     return (int(h) * 3600 + int(m) * 60 + s) * 1000 + ms
 
+@lru_cache(maxsize=None)
 def ms_to_vtt_time(ms_time):
     if ms_time < 0:
         ms_time = 0
-    seconds_total = ms_time // 1000
-    milliseconds = ms_time % 1000
-    minutes_total = seconds_total // 60
-    seconds = seconds_total % 60
-    hours = minutes_total // 60
-    minutes = minutes_total % 60
-    return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}.{int(milliseconds):03d}"
+    seconds_total, milliseconds = divmod(ms_time, 1000)
+    minutes_total, seconds = divmod(seconds_total, 60)
+    hours, minutes = divmod(minutes_total, 60)
+    return VTT_TIME_FORMAT % (hours, minutes, seconds, milliseconds)
 
 def parse_vtt_content(vtt_content_str):
-    lines = vtt_content_str.strip().splitlines()
+    blocks = VTT_BLOCK_SEPARATOR_REGEX.split("\n".join(vtt_content_str.strip().splitlines()))
     cues = []
-    idx = 0
 
-    while idx < len(lines):
-        line_strip = lines[idx].strip()
-        if "-->" in line_strip or line_strip == "":
-            break
-        idx += 1
-    
-    current_cue_lines = []
-    while idx < len(lines):
-        line = lines[idx] 
-        
-        if not line.strip(): 
-            if current_cue_lines:
-                time_line_str = None
-                text_start_idx_in_cue = -1
-
-                if "-->" in current_cue_lines[0]:
-                    time_line_str = current_cue_lines[0]
-                    text_start_idx_in_cue = 1
-                elif len(current_cue_lines) > 1 and "-->" in current_cue_lines[1]:
-                    time_line_str = current_cue_lines[1]
-                    text_start_idx_in_cue = 2
-                
-                if time_line_str:
-                    try:
-                        text_content_actual_lines = [l.strip() for l in current_cue_lines[text_start_idx_in_cue:]]
-                        start_str, end_str_full = time_line_str.strip().split("-->")
-                        end_str_cleaned = end_str_full.strip().split(' ')[0]
-                        start_ms = vtt_time_to_ms(start_str.strip())
-                        end_ms = vtt_time_to_ms(end_str_cleaned)
-                        
-                        cues.append({
-                            "start_ms": start_ms,
-                            "end_ms": end_ms,
-                            "text_lines": [l for l in text_content_actual_lines if l],
-                            "raw_cue_lines": list(current_cue_lines) 
-                        })
-                    except (ValueError, IndexError):
-                        pass 
-                current_cue_lines = [] 
-            idx += 1
-            continue 
-        
-        current_cue_lines.append(line) 
-        idx += 1
-
-    if current_cue_lines:
-        time_line_str = None
-        text_start_idx_in_cue = -1
-        if "-->" in current_cue_lines[0]:
-            time_line_str = current_cue_lines[0]
-            text_start_idx_in_cue = 1
-        elif len(current_cue_lines) > 1 and "-->" in current_cue_lines[1]:
-            time_line_str = current_cue_lines[1]
-            text_start_idx_in_cue = 2
-        
-        if time_line_str:
-            try:
-                text_content_actual_lines = [l.strip() for l in current_cue_lines[text_start_idx_in_cue:]]
-                start_str, end_str_full = time_line_str.strip().split("-->")
-                end_str_cleaned = end_str_full.strip().split(' ')[0]
-                start_ms = vtt_time_to_ms(start_str.strip())
-                end_ms = vtt_time_to_ms(end_str_cleaned)
-                cues.append({
-                    "start_ms": start_ms,
-                    "end_ms": end_ms,
-                    "text_lines": [l for l in text_content_actual_lines if l],
-                    "raw_cue_lines": list(current_cue_lines)
-                })
-            except (ValueError, IndexError):
-                pass
-            
+    # The header runs up to the first blank line or the first timing line, whichever comes first.
+    header_block = blocks[0]
+    arrow_pos = header_block.find("-->")
+    if arrow_pos == -1:
+        del blocks[0]
+    else:
+        blocks[0] = header_block[header_block.rfind("\n", 0, arrow_pos) + 1:]
+
+    for block in blocks:
+        nl = block.find("\n")
+        time_line_str = block if nl == -1 else block[:nl]
+        text_block = "" if nl == -1 else block[nl + 1:]
+        if "-->" not in time_line_str:
+            # The timing line may follow a single cue identifier line.
+            if nl == -1:
+                continue
+            next_nl = text_block.find("\n")
+            time_line_str = text_block if next_nl == -1 else text_block[:next_nl]
+            if "-->" not in time_line_str:
+                continue
+            text_block = "" if next_nl == -1 else text_block[next_nl + 1:]
+
+        start_str, _, end_str_full = time_line_str.strip().partition("-->")
+        if "-->" in end_str_full:
+            continue
+        end_parts = end_str_full.strip().split(' ', 1)
+        try:
+            start_ms = vtt_time_to_ms(start_str.strip())
+            end_ms = vtt_time_to_ms(end_parts[0])
+        except (ValueError, IndexError):
+            continue
+
+        text_lines = [l.strip() for l in text_block.split("\n")] if text_block else []
+        cues.append({
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "text_lines": text_lines,
+            "styling_suffix": " " + end_parts[1] if len(end_parts) > 1 else "",
+            # Newline-terminated cue text, reused verbatim by every chunk the cue lands in.
+            "text_block": "".join(l + "\n" for l in text_lines)
+        })
+
     return cues
 
 def generate_relative_vtt_from_cues(cues_in_segment, segment_absolute_start_ms):
-    vtt_parts = ["WEBVTT", ""]
     if not cues_in_segment:
         return None
 
+    cue_blocks = []
     for cue in cues_in_segment:
         relative_start_ms = cue["start_ms"] - segment_absolute_start_ms
+        if relative_start_ms < 0:
+            relative_start_ms = 0
         relative_end_ms = cue["end_ms"] - segment_absolute_start_ms
-        relative_start_ms = max(0, relative_start_ms)
-        relative_end_ms = max(relative_start_ms, relative_end_ms)
-
-        new_start_vtt = ms_to_vtt_time(relative_start_ms)
-        new_end_vtt = ms_to_vtt_time(relative_end_ms)
-
-        styling_suffix = ""
-        if cue.get("raw_cue_lines"):
-            original_time_line = ""
-            for raw_line in cue["raw_cue_lines"]:
-                if "-->" in raw_line:
-                    original_time_line = raw_line
-                    break
-            if original_time_line:
-                try:
-                    _, original_end_str_full = original_time_line.split("-->")
-                    original_end_parts = original_end_str_full.strip().split(' ', 1)
-                    if len(original_end_parts) > 1:
-                        styling_suffix = " " + original_end_parts[1]
-                except ValueError:
-                    styling_suffix = ""
-        
-        time_header = f"{new_start_vtt} --> {new_end_vtt}{styling_suffix}"
-        vtt_parts.append(time_header)
-        
-        cleaned_text_lines = cue.get("text_lines", [])
-        if not cleaned_text_lines and cue.get("raw_cue_lines"):
-            cue_id_lines = 0
-            time_line_index_in_raw = -1
-            if "-->" in cue["raw_cue_lines"][0]:
-                time_line_index_in_raw = 0
-            elif len(cue["raw_cue_lines"]) > 1 and "-->" in cue["raw_cue_lines"][1]:
-                 time_line_index_in_raw = 1
-            
-            if time_line_index_in_raw != -1:
-                text_portion_raw = cue["raw_cue_lines"][time_line_index_in_raw+1:]
-                if text_portion_raw and all(not line.strip() for line in text_portion_raw):
-                    for _ in text_portion_raw:
-                        vtt_parts.append("")
-                else:
-                    vtt_parts.extend(cleaned_text_lines)
-            else:
-                vtt_parts.extend(cleaned_text_lines)
-        else:
-            vtt_parts.extend(cleaned_text_lines)
-        vtt_parts.append("")
+        if relative_end_ms < relative_start_ms:
+            relative_end_ms = relative_start_ms
+
+        # Cue settings after the end timestamp are captured once in parse_vtt_content.
+        cue_blocks.append(
+            f"{ms_to_vtt_time(relative_start_ms)} --> {ms_to_vtt_time(relative_end_ms)}{cue['styling_suffix']}\n{cue['text_block']}"
+        )
+
+    return "WEBVTT\n\n" + "\n".join(cue_blocks)
+
+def probe_duration_ms(audio_file_path):
+    """Returns the container duration of an audio file in milliseconds (PyAV, else ffprobe)."""
+    if AV_AVAILABLE:
+        with av.open(audio_file_path) as container:
+            return container.duration // 1000
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", audio_file_path],
+        check=True, capture_output=True, text=True
+    )
+    return int(float(result.stdout.strip()) * 1000)
+
+def _run_ffmpeg_chunk_batch(audio_file_path, output_dir, batch):
+    command = ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", audio_file_path]
+    for start_ms, end_ms, relative_path in batch:
+        command += ["-map", "0:a:0", "-ss", f"{start_ms / 1000:.3f}", "-to", f"{end_ms / 1000:.3f}",
+                    "-c", "copy", relative_path]
+    result = subprocess.run(command, cwd=output_dir, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        logging.error(f"Error saving audio chunks from {audio_file_path} into {output_dir}: {result.stderr.strip()}")
+    written = 0
+    for _, _, relative_path in batch:
+        chunk_path = os.path.join(output_dir, relative_path)
+        if os.path.exists(chunk_path) and os.path.getsize(chunk_path) > 0:
+            written += 1
+    return written
+
+def export_audio_chunks(audio_file_path, output_dir, chunk_specs):
+    """
+    Cuts (start_ms, end_ms, relative_path) chunks out of audio_file_path into output_dir with
+    stream copy, one ffmpeg process per batch of outputs and up to FFMPEG_BATCH_THREADS batches
+    at a time. Returns the number of chunk files written.
+    """
+    batches = [
+        chunk_specs[batch_start:batch_start + FFMPEG_MAX_OUTPUTS_PER_CALL]
+        for batch_start in range(0, len(chunk_specs), FFMPEG_MAX_OUTPUTS_PER_CALL)
+    ]
+    if len(batches) == 1:
+        return _run_ffmpeg_chunk_batch(audio_file_path, output_dir, batches[0])
+    with ThreadPoolExecutor(max_workers=min(FFMPEG_BATCH_THREADS, len(batches))) as executor:
+        return sum(executor.map(lambda batch: _run_ffmpeg_chunk_batch(audio_file_path, output_dir, batch), batches))
+
+def remux_audio_chunks_av(audio_file_path, output_dir, chunk_specs):
+    """
+    Copies (start_ms, end_ms, relative_path) chunks out of audio_file_path into output_dir in a
+    single demux pass with PyAV. Packets are remuxed with rebased timestamps and never decoded, so memory stays at
+    packet size regardless of source length. Returns the number of chunk files written.
+    """
+    written = 0
+    pending = sorted(chunk_specs)
+    next_pending_idx = 0
+    active = []  # [end_ms, output_container, output_stream, first_pts]
+    try:
+        with av.open(audio_file_path) as container:
+            stream = container.streams.audio[0]
+            ms_per_tick = float(stream.time_base) * 1000
+            for packet in container.demux(stream):
+                if packet.pts is None:
+                    continue
+                packet_ms = packet.pts * ms_per_tick
+
+                still_active = []
+                for chunk in active:
+                    if packet_ms >= chunk[0]:
+                        chunk[1].close()
+                        written += 1
+                    else:
+                        still_active.append(chunk)
+                active = still_active
+
+                while next_pending_idx < len(pending) and pending[next_pending_idx][0] <= packet_ms:
+                    _, end_ms, relative_path = pending[next_pending_idx]
+                    next_pending_idx += 1
+                    if packet_ms < end_ms:
+                        output = av.open(os.path.join(output_dir, relative_path), 'w', format='mp3')
+                        active.append([end_ms, output, output.add_stream_from_template(stream), packet.pts])
+
+                if not active:
+                    if next_pending_idx >= len(pending):
+                        break
+                    continue
+
+                # Muxing hands the packet buffer to the output, so overlapping chunks get their own copy.
+                pts, dts = packet.pts, packet.dts
+                for _, output, output_stream, first_pts in active:
+                    out_packet = packet if len(active) == 1 else av.Packet(bytes(packet))
+                    out_packet.pts = pts - first_pts
+                    out_packet.dts = (dts if dts is not None else pts) - first_pts
+                    out_packet.time_base = stream.time_base
+                    out_packet.stream = output_stream
+                    output.mux(out_packet)
+    except Exception as e:
+        logging.error(f"Error remuxing audio chunks from {audio_file_path}: {e}")
+    finally:
+        for chunk in active:
+            chunk[1].close()
+            written += 1
+    return written
+
+def plan_chunks_from_cues(original_cues, target_s):
+    """
+    Groups start-sorted cues into chunk windows of roughly target_s seconds.
+    Returns (chunk_num, start_ms, end_ms, vtt_chunk_bytes) tuples with the chunk VTT already UTF-8
+    encoded; a window whose start_ms is past its end_ms carries no VTT and does not consume a chunk number.
+    """
+    target_ms = target_s * 1000
+    max_chunk_ms = target_ms * 1.5
+    chunk_plan = []
+    cue_count = len(original_cues)
+    current_global_cue_idx = 0
+    chunk_num = 0
+
+    while current_global_cue_idx < cue_count:
+        chunk_intended_start_ms_abs = original_cues[current_global_cue_idx]["start_ms"]
+
+        # The first cue always opens the chunk; later cues join while the chunk stays within
+        # 1.5x the target, and the chunk closes once it reaches the target.
+        chunk_end_cue_idx = current_global_cue_idx + 1
+        while chunk_end_cue_idx < cue_count:
+            potential_duration_if_added = original_cues[chunk_end_cue_idx]["end_ms"] - chunk_intended_start_ms_abs
+            if potential_duration_if_added > max_chunk_ms:
+                break
+            chunk_end_cue_idx += 1
+            if potential_duration_if_added >= target_ms:
+                break
+
+        cues_for_this_chunk = original_cues[current_global_cue_idx:chunk_end_cue_idx]
+        chunk_actual_start_ms = cues_for_this_chunk[0]["start_ms"]
+        chunk_actual_end_ms = cues_for_this_chunk[-1]["end_ms"]
+        current_global_cue_idx = chunk_end_cue_idx
+
+        if chunk_actual_start_ms > chunk_actual_end_ms: 
+            chunk_plan.append((chunk_num, chunk_actual_start_ms, chunk_actual_end_ms, None))
+            continue
+
+        vtt_chunk_str = generate_relative_vtt_from_cues(cues_for_this_chunk, chunk_actual_start_ms)
+        vtt_chunk_bytes = vtt_chunk_str.encode('utf-8') if vtt_chunk_str else None
+        chunk_plan.append((chunk_num, chunk_actual_start_ms, chunk_actual_end_ms, vtt_chunk_bytes))
+        chunk_num += 1
 
-    if len(vtt_parts) > 2:
-        return "\n".join(vtt_parts)
-    return None
+    return chunk_plan
 
-def process_single_audio_and_transcript_file(audio_file_path, output_base_dir, target_chunk_durations_s, base_input_transcript_dir):
-    pid = os.getpid()
+def process_single_audio_and_transcript_file(audio_file_path, output_base_dir, target_chunk_durations_s, base_input_transcript_dir, transcript_cache=None):
+    if transcript_cache is None:
+        transcript_cache = {}
     processed_audio_chunks_count = 0
     created_transcript_chunks_count = 0
     youtube_video_id = "unknown_video_id"
@@ -190,18 +290,28 @@ def process_single_audio_and_transcript_file(audio_file_path, output_base_dir, t
         youtube_video_id = os.path.basename(os.path.dirname(audio_file_path))
 
         if not youtube_video_id or not noisy_level_folder_name:
-            print(f"[PID {pid}] Could not determine video ID or noisy level for {audio_file_path}. Skipping.")
+            logging.error(f"Could not determine video ID or noisy level for {audio_file_path}. Skipping.")
             return None, 0, 0
 
         all_parsed_vtt_data = [] 
         vtt_files_to_actually_parse = [] 
 
         transcript_dir_for_video_id = os.path.join(base_input_transcript_dir, youtube_video_id)
-        if os.path.isdir(transcript_dir_for_video_id):
-            all_available_vtt_filenames = sorted([
-                fn for fn in os.listdir(transcript_dir_for_video_id)
-                if fn.endswith(".vtt") and not fn.startswith(f"{noisy_level_folder_name}_audio_")
-            ])
+        listing_key = ("listing", transcript_dir_for_video_id)
+        if listing_key not in transcript_cache:
+            try:
+                with os.scandir(transcript_dir_for_video_id) as entries:
+                    transcript_cache[listing_key] = sorted(
+                        entry.name for entry in entries if entry.name.endswith(".vtt") and entry.is_file()
+                    )
+            except (FileNotFoundError, NotADirectoryError):
+                transcript_cache[listing_key] = None
+
+        if transcript_cache[listing_key] is not None:
+            all_available_vtt_filenames = [
+                fn for fn in transcript_cache[listing_key]
+                if not fn.startswith(f"{noisy_level_folder_name}_audio_")
+            ]
 
             gt_vtt_files = [fn for fn in all_available_vtt_filenames if fn.endswith(".gt.vtt")]
 
@@ -209,110 +319,116 @@ def process_single_audio_and_transcript_file(audio_file_path, output_base_dir, t
                 selected_gt_vtt = gt_vtt_files[0]
                 vtt_files_to_actually_parse.append(selected_gt_vtt)
                 if len(gt_vtt_files) > 1:
-                    print(f"[PID {pid}] WARNING: Multiple '.gt.vtt' files found for {audio_file_path}. Using only the first: {selected_gt_vtt}. Others: {gt_vtt_files[1:]}")
+                    logging.warning(f"Multiple '.gt.vtt' files found for {audio_file_path}. Using only the first: {selected_gt_vtt}. Others: {gt_vtt_files[1:]}")
             elif all_available_vtt_filenames:
                 vtt_files_to_actually_parse.extend(all_available_vtt_filenames)
-                print(f"[PID {pid}] INFO: No '.gt.vtt' file found for {audio_file_path}. Processing other available VTTs: {vtt_files_to_actually_parse}")
+                logging.info(f"No '.gt.vtt' file found for {audio_file_path}. Processing other available VTTs: {vtt_files_to_actually_parse}")
 
             for vtt_filename in vtt_files_to_actually_parse:
                 original_transcript_path = os.path.join(transcript_dir_for_video_id, vtt_filename)
                 try:
-                    with open(original_transcript_path, 'r', encoding='utf-8') as f:
-                        vtt_content_str = f.read()
-                    cues = parse_vtt_content(vtt_content_str)
-                    if cues: 
+                    cues_key = ("cues", original_transcript_path)
+                    cues = transcript_cache.get(cues_key)
+                    if cues is None:
+                        with open(original_transcript_path, 'r', encoding='utf-8') as f:
+                            vtt_content_str = f.read()
+                        cues = parse_vtt_content(vtt_content_str)
                         cues.sort(key=lambda c: c["start_ms"])
+                        transcript_cache[cues_key] = cues
+                    if cues: 
                         vtt_basename = os.path.splitext(vtt_filename)[0]
                         all_parsed_vtt_data.append((vtt_basename, cues))
                 except Exception as e:
-                    print(f"[PID {pid}] Error reading/parsing VTT {original_transcript_path}: {e}")
+                    logging.error(f"Error reading/parsing VTT {original_transcript_path}: {e}")
         
         if not all_parsed_vtt_data:
-            print(f"[PID {pid}] No usable VTT data for {audio_file_path} after selection/parsing. Skipping VTT-based processing.")
-            return youtube_video_id, 0, 0
-
-        try:
-            audio = AudioSegment.from_mp3(audio_file_path)
-        except Exception as e:
-            print(f"[PID {pid}] Error loading audio {audio_file_path}: {e}. Skipping.")
+            logging.warning(f"No usable VTT data for {audio_file_path} after selection/parsing. Skipping VTT-based processing.")
             return youtube_video_id, 0, 0
 
+        video_output_dir = os.path.join(output_base_dir, youtube_video_id)
+        chunk_relative_dirs = {}
+        chunk_output_dirs = {}
+        existing_audio_chunks = {}
+        for target_s in target_chunk_durations_s:
+            chunk_relative_dirs[target_s] = os.path.join(f"chunk_{target_s}s", noisy_level_folder_name)
+            chunk_output_dirs[target_s] = os.path.join(video_output_dir, chunk_relative_dirs[target_s])
+            try:
+                with os.scandir(chunk_output_dirs[target_s]) as entries:
+                    existing_audio_chunks[target_s] = {
+                        entry.name for entry in entries
+                        if entry.name.endswith(".mp3") and entry.stat().st_size > 0
+                    }
+            except FileNotFoundError:
+                existing_audio_chunks[target_s] = set()
+
+        # Find missing audio chunks up front so a rerun with every chunk on disk never opens the MP3.
+        chunk_plans = []
+        need_audio = False
         for vtt_basename, original_cues in all_parsed_vtt_data:
             for target_s in target_chunk_durations_s:
-                target_ms = target_s * 1000
-                chunk_size_specific_dir = os.path.join(output_base_dir, youtube_video_id, f"chunk_{target_s}s")
-                noisy_level_specific_chunk_output_dir = os.path.join(chunk_size_specific_dir, noisy_level_folder_name)
-                os.makedirs(noisy_level_specific_chunk_output_dir, exist_ok=True)
-
-                current_global_cue_idx = 0
-                chunk_num = 0
+                plan_key = ("chunks", vtt_basename, target_s)
+                chunk_plan = transcript_cache.get(plan_key)
+                if chunk_plan is None:
+                    chunk_plan = transcript_cache[plan_key] = plan_chunks_from_cues(original_cues, target_s)
+                chunk_plans.append((vtt_basename, target_s, chunk_plan))
+                chunk_name_prefix = f"{vtt_basename}_audio_"
+                need_audio = need_audio or any(
+                    start_ms <= end_ms and f"{chunk_name_prefix}{chunk_num}.mp3" not in existing_audio_chunks[target_s]
+                    for chunk_num, start_ms, end_ms, _ in chunk_plan
+                )
+
+        audio_duration_ms = 0
+        if need_audio:
+            try:
+                audio_duration_ms = probe_duration_ms(audio_file_path)
+            except Exception as e:
+                logging.error(f"Error probing audio {audio_file_path}: {e}. Skipping.")
+                return youtube_video_id, 0, 0
+
+        # Audio chunks for every target duration are cut from a single read of the source.
+        pending_audio_chunks = []
+
+        for vtt_basename, target_s, chunk_plan in chunk_plans:
+            noisy_level_specific_chunk_output_dir = chunk_output_dirs[target_s]
+            os.makedirs(noisy_level_specific_chunk_output_dir, exist_ok=True)
+            existing_audio_chunks_for_size = existing_audio_chunks[target_s]
+            # Per-chunk paths are these prefixes plus "<chunk_num>.<ext>".
+            chunk_name_prefix = f"{vtt_basename}_audio_"
+            audio_relative_prefix = f"{chunk_relative_dirs[target_s]}{os.sep}{chunk_name_prefix}"
+            transcript_path_prefix = f"{noisy_level_specific_chunk_output_dir}{os.sep}{chunk_name_prefix}"
+
+            for chunk_num, chunk_actual_start_ms, chunk_actual_end_ms, vtt_chunk_bytes in chunk_plan:
+                if chunk_actual_start_ms > chunk_actual_end_ms: 
+                    logging.warning(f"Audio segment start_ms ({chunk_actual_start_ms}) > end_ms ({chunk_actual_end_ms}) for {chunk_name_prefix}{chunk_num} in {audio_file_path}. Skipping segment.")
+                    continue
                 
-                while current_global_cue_idx < len(original_cues):
-                    cues_for_this_chunk = []
-                    chunk_intended_start_ms_abs = original_cues[current_global_cue_idx]["start_ms"]
-                    
-                    temp_cue_collector_idx = current_global_cue_idx
-                    while temp_cue_collector_idx < len(original_cues):
-                        cue_to_consider = original_cues[temp_cue_collector_idx]
-                        potential_duration_if_added = cue_to_consider["end_ms"] - chunk_intended_start_ms_abs
-
-                        if not cues_for_this_chunk:
-                            cues_for_this_chunk.append(cue_to_consider)
-                            temp_cue_collector_idx += 1
-                        elif potential_duration_if_added <= target_ms * 1.5:
-                            cues_for_this_chunk.append(cue_to_consider)
-                            temp_cue_collector_idx += 1
-                            if potential_duration_if_added >= target_ms:
-                                break
-                        else:
-                            break 
-                    
-                    if not cues_for_this_chunk:
-                        break 
-
-                    chunk_actual_start_ms = cues_for_this_chunk[0]["start_ms"]
-                    chunk_actual_end_ms = cues_for_this_chunk[-1]["end_ms"]
-
-                    if chunk_actual_start_ms > chunk_actual_end_ms: 
-                        print(f"[PID {pid}] WARNING: Audio segment start_ms ({chunk_actual_start_ms}) > end_ms ({chunk_actual_end_ms}) for {vtt_basename}_audio_{chunk_num} in {audio_file_path}. Skipping segment.")
-                        current_global_cue_idx = temp_cue_collector_idx 
-                        continue
-                    
+                if chunk_actual_start_ms < audio_duration_ms and f"{chunk_name_prefix}{chunk_num}.mp3" not in existing_audio_chunks_for_size:
+                    pending_audio_chunks.append((
+                        chunk_actual_start_ms, min(chunk_actual_end_ms, audio_duration_ms),
+                        f"{audio_relative_prefix}{chunk_num}.mp3"
+                    ))
+                
+                if vtt_chunk_bytes:
+                    transcript_chunk_filepath = f"{transcript_path_prefix}{chunk_num}.vtt"
+                    # VTT chunks are always rewritten, so open/truncate directly without an existence check.
                     try:
-                        audio_segment = audio[chunk_actual_start_ms:chunk_actual_end_ms]
+                        fd = os.open(transcript_chunk_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                        try:
+                            os.write(fd, vtt_chunk_bytes)
+                        finally:
+                            os.close(fd)
+                        created_transcript_chunks_count += 1
                     except Exception as e:
-                        print(f"[PID {pid}] Error slicing audio for {vtt_basename}_audio_{chunk_num} ({chunk_actual_start_ms}:{chunk_actual_end_ms}) in {audio_file_path}: {e}. Skipping segment.")
-                        current_global_cue_idx = temp_cue_collector_idx
-                        continue
-
-                    audio_chunk_filename = f"{vtt_basename}_audio_{chunk_num}.mp3"
-                    audio_chunk_filepath = os.path.join(noisy_level_specific_chunk_output_dir, audio_chunk_filename)
+                        logging.error(f"Error writing VTT chunk {transcript_chunk_filepath}: {e}")
 
-                    if not os.path.exists(audio_chunk_filepath) or os.path.getsize(audio_chunk_filepath) == 0:
-                        try:
-                            audio_segment.export(audio_chunk_filepath, format="mp3")
-                            processed_audio_chunks_count += 1
-                        except Exception as e:
-                            print(f"[PID {pid}] Error saving audio chunk {audio_chunk_filepath}: {e}")
-                    
-                    vtt_chunk_str = generate_relative_vtt_from_cues(cues_for_this_chunk, chunk_actual_start_ms)
-                    if vtt_chunk_str:
-                        transcript_chunk_filename = f"{vtt_basename}_audio_{chunk_num}.vtt"
-                        transcript_chunk_filepath = os.path.join(noisy_level_specific_chunk_output_dir, transcript_chunk_filename)
-                        if not os.path.exists(transcript_chunk_filepath) or True:
-                            try:
-                                with open(transcript_chunk_filepath, 'w', encoding='utf-8') as f_out:
-                                    f_out.write(vtt_chunk_str)
-                                created_transcript_chunks_count += 1
-                            except Exception as e:
-                                print(f"[PID {pid}] Error writing VTT chunk {transcript_chunk_filepath}: {e}")
-                    
-                    chunk_num += 1
-                    current_global_cue_idx = temp_cue_collector_idx
+        if pending_audio_chunks:
+            if AV_AVAILABLE:
+                processed_audio_chunks_count += remux_audio_chunks_av(audio_file_path, video_output_dir, pending_audio_chunks)
+            else:
+                processed_audio_chunks_count += export_audio_chunks(audio_file_path, video_output_dir, pending_audio_chunks)
 
     except Exception as e:
-        tb_str = traceback.format_exc()
-        print(f"[PID {pid}] MAJOR UNHANDLED error in process_single_audio_and_transcript_file for {audio_file_path}: {e}\nTraceback:\n{tb_str}")
+        logging.exception(f"MAJOR UNHANDLED error in process_single_audio_and_transcript_file for {audio_file_path}: {e}")
         if audio_file_path and os.path.dirname(audio_file_path): 
              youtube_video_id_fallback = os.path.basename(os.path.dirname(audio_file_path))
              return youtube_video_id_fallback, processed_audio_chunks_count, created_transcript_chunks_count
@@ -320,6 +436,59 @@ def process_single_audio_and_transcript_file(audio_file_path, output_base_dir, t
     
     return youtube_video_id, processed_audio_chunks_count, created_transcript_chunks_count
 
+def process_video_group(audio_file_paths, output_base_dir, target_chunk_durations_s, base_input_transcript_dir):
+    """
+    Processes every noisy-level MP3 of one video in a single task so the transcript listing,
+    parsed cues and chunk plans are built once and shared. Returns one result per audio file.
+    """
+    transcript_cache = {}
+    return [
+        process_single_audio_and_transcript_file(audio_file_path, output_base_dir, target_chunk_durations_s,
+                                                 base_input_transcript_dir, transcript_cache=transcript_cache)
+        for audio_file_path in audio_file_paths
+    ]
+
+def _route_logging_to_queue(log_queue):
+    """Replaces the root handlers of a worker process with one that forwards records to the parent."""
+    root_logger = logging.getLogger()
+    root_logger.handlers = [QueueHandler(log_queue)]
+    root_logger.setLevel(logging.INFO)
+
+def _init_chunking_worker(output_base_dir, target_chunk_durations_s, base_input_transcript_dir, log_queue):
+    """
+    Stores the run-wide chunking settings once per worker so each task only pickles its file paths,
+    and routes the worker's log records to the parent.
+    """
+    _worker_config.update(
+        output_base_dir=output_base_dir,
+        target_chunk_durations_s=target_chunk_durations_s,
+        base_input_transcript_dir=base_input_transcript_dir,
+    )
+    _route_logging_to_queue(log_queue)
+
+def _process_video_group_task(audio_file_paths):
+    return process_video_group(audio_file_paths, **_worker_config)
+
+def _list_mp3_files(video_dir_path):
+    try:
+        with os.scandir(video_dir_path) as entries:
+            return [
+                entry.path for entry in entries
+                if not entry.name.startswith('.') and os.path.normcase(entry.name).endswith(".mp3")
+            ]
+    except OSError:
+        return []
+
+def find_audio_files(base_input_audio_dir):
+    """Lists <base>/<video_id>/*.mp3 the way glob does, scanning the video folders concurrently."""
+    try:
+        with os.scandir(base_input_audio_dir) as entries:
+            video_dir_paths = [entry.path for entry in entries if not entry.name.startswith('.') and entry.is_dir()]
+    except OSError:
+        return []
+    with ThreadPoolExecutor(max_workers=DIRECTORY_SCAN_THREADS) as executor:
+        return [path for paths in executor.map(_list_mp3_files, video_dir_paths) for path in paths]
+
 def create_chunked_dataset_parallel(base_input_audio_dir, base_input_transcript_dir, output_base_dir, num_processes=None):
     start_time = time.time()
 
@@ -330,7 +499,7 @@ def create_chunked_dataset_parallel(base_input_audio_dir, base_input_transcript_
     # target_chunk_durations_s = [8, 30, 60]
     target_chunk_durations_s = [5]
 
-    audio_files = glob.glob(os.path.join(base_input_audio_dir, "*", "*.mp3"))
+    audio_files = find_audio_files(base_input_audio_dir)
     if not audio_files:
         print(f"No MP3 files found in subdirectories of {base_input_audio_dir}. Example structure: {base_input_audio_dir}/<video_id>/<audio_file.mp3>. Exiting.")
         return
@@ -340,40 +509,51 @@ def create_chunked_dataset_parallel(base_input_audio_dir, base_input_transcript_
     actual_num_processes = num_processes if num_processes is not None else os.cpu_count()
     print(f"\n--- Starting Parallel Audio and Transcript Chunking (using up to {actual_num_processes} processes) ---")
 
-    worker_func = partial(process_single_audio_and_transcript_file,
-                          output_base_dir=output_base_dir,
-                          target_chunk_durations_s=target_chunk_durations_s,
-                          base_input_transcript_dir=base_input_transcript_dir)
+    audio_files_by_video = defaultdict(list)
+    for audio_file_path in audio_files:
+        audio_files_by_video[os.path.dirname(audio_file_path)].append(audio_file_path)
+    # Largest videos first (longest-processing-time scheduling) so one long source does not run alone at the end.
+    video_groups = sorted(audio_files_by_video.values(),
+                          key=lambda paths: sum(os.path.getsize(path) for path in paths), reverse=True)
 
     processed_video_ids = set()
     total_audio_chunks_overall = 0 
     total_transcript_chunks_overall = 0 
-    results = [] 
-
-    with multiprocessing.Pool(processes=actual_num_processes) as pool:
-        with tqdm(total=len(audio_files), desc="Processing audio files") as pbar:
-            for result in pool.imap_unordered(worker_func, audio_files):
-                results.append(result)
-                pbar.update()
-
     files_where_audio_chunks_were_made = 0
     files_where_transcript_chunks_were_made = 0
 
-    for res in results: 
-        if res is None: 
-            print("Warning: Worker function returned None for a file processing attempt.")
-            continue
-        video_id_result, audio_count_for_file, transcript_count_for_file = res
-        
-        if video_id_result and "unknown_video_id" not in video_id_result: 
-            processed_video_ids.add(video_id_result)
-        if audio_count_for_file > 0:
-            files_where_audio_chunks_were_made += 1
-        if transcript_count_for_file > 0:
-            files_where_transcript_chunks_were_made += 1
-        total_audio_chunks_overall += audio_count_for_file
-        total_transcript_chunks_overall += transcript_count_for_file
-            
+    # Workers enqueue log records instead of contending for stdout; one listener thread writes them.
+    log_handler = logging.StreamHandler(sys.stdout)
+    log_handler.setFormatter(logging.Formatter(WORKER_LOG_FORMAT))
+    log_queue = multiprocessing.Queue()
+    log_listener = QueueListener(log_queue, log_handler)
+    log_listener.start()
+
+    try:
+        with ProcessPoolExecutor(max_workers=actual_num_processes, initializer=_init_chunking_worker,
+                                 initargs=(output_base_dir, target_chunk_durations_s, base_input_transcript_dir, log_queue)) as executor:
+            with tqdm(total=len(audio_files), desc="Processing audio files") as pbar:
+                futures = [executor.submit(_process_video_group_task, group) for group in video_groups]
+                for future in as_completed(futures):
+                    group_results = future.result()
+                    pbar.update(len(group_results))
+                    for res in group_results:
+                        if res is None: 
+                            print("Warning: Worker function returned None for a file processing attempt.")
+                            continue
+                        video_id_result, audio_count_for_file, transcript_count_for_file = res
+
+                        if video_id_result and "unknown_video_id" not in video_id_result: 
+                            processed_video_ids.add(video_id_result)
+                        if audio_count_for_file > 0:
+                            files_where_audio_chunks_were_made += 1
+                        if transcript_count_for_file > 0:
+                            files_where_transcript_chunks_were_made += 1
+                        total_audio_chunks_overall += audio_count_for_file
+                        total_transcript_chunks_overall += transcript_count_for_file
+    finally:
+        log_listener.stop()
+
     print(f"--- Finished Audio and Transcript Chunking Phase ---")
     print(f"Checked/Processed {len(audio_files)} source audio files corresponding to {len(processed_video_ids)} unique video IDs.")
     print(f"Audio chunking operations were performed for {files_where_audio_chunks_were_made} source audio files (across all target durations).")
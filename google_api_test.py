@@ -2,6 +2,7 @@ import os
 import traceback
 import numpy as np
 import librosa
+import soxr
 from google.cloud import speech
 
 AUDIO_FILE_PATH = "sampled_testcase/TC-1/chunk_8/0Ejp6yyU5bo_noisy_0_audio_92.mp3"
@@ -9,17 +10,13 @@ TARGET_SAMPLE_RATE = 16000
 LANGUAGE_CODE = "yue-Hant-HK"
 
 def resample_audio(audio_array: np.ndarray, current_sr: int, target_sr: int) -> np.ndarray:
-    """Resamples audio using librosa."""
+    """Resamples audio using soxr."""
     if current_sr == target_sr:
         return audio_array
     print(f"Resampling from {current_sr} Hz to {target_sr} Hz...")
-    if audio_array.dtype != np.float32:
-        audio_array = audio_array.astype(np.float32)
+    audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
 
-    if not audio_array.flags['C_CONTIGUOUS']:
-        audio_array = np.ascontiguousarray(audio_array)
-
-    resampled_audio = librosa.resample(audio_array, orig_sr=current_sr, target_sr=target_sr)
+    resampled_audio = soxr.resample(audio_array, current_sr, target_sr, quality='HQ')
     return resampled_audio
 
 def run_google_api_test():
@@ -65,12 +62,11 @@ def run_google_api_test():
         if original_sampling_rate != TARGET_SAMPLE_RATE:
             audio_array_resampled = resample_audio(audio_array, original_sampling_rate, TARGET_SAMPLE_RATE)
         else:
-            audio_array_resampled = audio_array
-            if audio_array_resampled.dtype != np.float32:
-                audio_array_resampled = audio_array_resampled.astype(np.float32)
+            audio_array_resampled = np.asarray(audio_array, dtype=np.float32)
 
         np.clip(audio_array_resampled, -1.0, 1.0, out=audio_array_resampled)
-        int16_array = (audio_array_resampled * 32767).astype(np.int16)
+        np.multiply(audio_array_resampled, 32767, out=audio_array_resampled)
+        int16_array = audio_array_resampled.astype(np.int16)
         content = int16_array.tobytes()
         print(f"Audio prepared: {len(content)} bytes, Target Rate={TARGET_SAMPLE_RATE} Hz")
 
@@ -1,23 +1,33 @@
 import os
+import io
 import re
 import traceback
 from urllib.parse import parse_qs, urlparse
 import numpy as np
 import librosa
+import soxr
+import soundfile as sf
 from google.cloud import speech
-import concurrent.futures
+from functools import lru_cache
 from tqdm import tqdm
 from google.oauth2 import service_account
 import json
+import csv
 import time
+import threading
+import queue
 from typing import Tuple, Optional, List, Dict
-import pandas as pd
 
 BASE_AUDIO_DIRECTORY = "testset"
 TARGET_SAMPLE_RATE = 16000
-MAX_WORKERS = 8
+MAX_WORKERS = 32
+PREP_WORKERS = os.cpu_count() or 1
+PREPARED_AUDIO_QUEUE_SIZE = 64
+SYNC_RECOGNIZE_MAX_SECONDS = 60
+LONG_RUNNING_TIMEOUT_SECONDS = 600
 
 AUDIO_EXTENSIONS = ['.mp3', '.wav', '.flac', '.aac']
+VIDEO_ID_REGEX = re.compile(r"([a-zA-Z0-9_-]{11})")
 CREDENTIALS_PATH = "C:/Users/User/stt-benchmark-key.json"
 URL_META_JSON_PATH = "urls.meta.json"
 
@@ -142,19 +152,37 @@ def load_url_metadata(json_file_path: str, name_to_code_map: dict, target_codes_
         print(f"Successfully loaded language metadata for {len(video_id_to_lang_code)} video IDs.")
     return video_id_to_lang_code
 
+_speech_client = None
+_speech_client_lock = threading.Lock()
+
+def get_speech_client() -> speech.SpeechClient:
+    global _speech_client
+    if _speech_client is None:
+        with _speech_client_lock:
+            if _speech_client is None:
+                credentials = service_account.Credentials.from_service_account_file(CREDENTIALS_PATH)
+                _speech_client = speech.SpeechClient(credentials=credentials)
+    return _speech_client
+
+@lru_cache(maxsize=None)
+def get_recognition_config(language_code: str) -> speech.RecognitionConfig:
+    return speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding.FLAC,
+        sample_rate_hertz=TARGET_SAMPLE_RATE,
+        language_code=language_code,
+        enable_automatic_punctuation=True,
+        enable_word_time_offsets=True
+    )
+
 def resample_audio(audio_array: np.ndarray, current_sr: int, target_sr: int) -> np.ndarray:
     if current_sr == target_sr:
         return audio_array
-    if audio_array.dtype != np.float32:
-        audio_array = audio_array.astype(np.float32)
-    if not audio_array.flags['C_CONTIGUOUS']:
-        audio_array = np.ascontiguousarray(audio_array)
-    resampled_audio = librosa.resample(audio_array, orig_sr=current_sr, target_sr=target_sr)
+    audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
+    resampled_audio = soxr.resample(audio_array, current_sr, target_sr, quality='HQ')
     return resampled_audio
 
-def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
+def prepare_audio_content(task_details: tuple) -> Optional[Tuple[bytes, float]]:
     audio_file_path, output_txt_path, specific_language_code = task_details
-    api_call_duration: Optional[float] = None
 
     if not specific_language_code:
         error_msg = f"Error for {audio_file_path}: No specific language code provided for transcription.\n"
@@ -163,37 +191,23 @@ def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
                 f.write(error_msg)
         except Exception as e_write:
             print(f"Critical: Failed to write error to {output_txt_path} for {audio_file_path}. Error: {e_write}")
-        return output_txt_path, api_call_duration
+        return None
 
     try:
         audio_array, original_sampling_rate = librosa.load(audio_file_path, sr=None, mono=True)
         if audio_array.size == 0:
             with open(output_txt_path, 'w', encoding='utf-8') as f:
                 f.write(f"Error for {audio_file_path}: Audio array loaded from file is empty.\n")
-            return output_txt_path, api_call_duration
+            return None
     except FileNotFoundError:
         with open(output_txt_path, 'w', encoding='utf-8') as f:
             f.write(f"Error for {audio_file_path}: Audio file not found.\n")
-        return output_txt_path, api_call_duration
+        return None
     except Exception as e:
         error_msg = f"Error loading/preparing audio file {audio_file_path}: {e}\n{traceback.format_exc()}"
         with open(output_txt_path, 'w', encoding='utf-8') as f:
             f.write(error_msg)
-        return output_txt_path, api_call_duration
-
-    try:
-        if not os.path.exists(CREDENTIALS_PATH):
-            error_msg = f"Error initializing Google Speech client for {audio_file_path}: Credentials file not found at {CREDENTIALS_PATH}\n"
-            with open(output_txt_path, 'w', encoding='utf-8') as f:
-                f.write(error_msg)
-            return output_txt_path, api_call_duration
-        credentials = service_account.Credentials.from_service_account_file(CREDENTIALS_PATH)
-        client = speech.SpeechClient(credentials=credentials)
-    except Exception as e:
-        error_msg = f"Error initializing Google Speech client for {audio_file_path}: {e}\n{traceback.format_exc()}"
-        with open(output_txt_path, 'w', encoding='utf-8') as f:
-            f.write(error_msg)
-        return output_txt_path, api_call_duration
+        return None
 
     try:
         if original_sampling_rate != TARGET_SAMPLE_RATE:
@@ -201,25 +215,42 @@ def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
         else:
             audio_array_resampled = audio_array
         
-        if audio_array_resampled.dtype != np.float32:
-            audio_array_resampled = audio_array_resampled.astype(np.float32)
+        audio_array_resampled = np.asarray(audio_array_resampled, dtype=np.float32)
 
         np.clip(audio_array_resampled, -1.0, 1.0, out=audio_array_resampled)
-        int16_array = (audio_array_resampled * 32767).astype(np.int16)
-        content = int16_array.tobytes()
+        np.multiply(audio_array_resampled, 32767, out=audio_array_resampled)
+        int16_array = audio_array_resampled.astype(np.int16)
+        flac_buffer = io.BytesIO()
+        sf.write(flac_buffer, int16_array, TARGET_SAMPLE_RATE, format='FLAC', subtype='PCM_16')
+        return flac_buffer.getvalue(), len(int16_array) / TARGET_SAMPLE_RATE
     except Exception as e:
         error_msg = f"Error processing audio array for {audio_file_path}: {e}\n{traceback.format_exc()}"
         with open(output_txt_path, 'w', encoding='utf-8') as f:
             f.write(error_msg)
+        return None
+
+def recognize_audio_content(task_details: tuple, prepared_audio: Optional[Tuple[bytes, float]]) -> Tuple[str, Optional[float]]:
+    audio_file_path, output_txt_path, specific_language_code = task_details
+    api_call_duration: Optional[float] = None
+
+    if prepared_audio is None:
         return output_txt_path, api_call_duration
+    content, audio_duration_seconds = prepared_audio
 
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=TARGET_SAMPLE_RATE,
-        language_code=specific_language_code,
-        enable_automatic_punctuation=True,
-        enable_word_time_offsets=True
-    )
+    try:
+        if not os.path.exists(CREDENTIALS_PATH):
+            error_msg = f"Error initializing Google Speech client for {audio_file_path}: Credentials file not found at {CREDENTIALS_PATH}\n"
+            with open(output_txt_path, 'w', encoding='utf-8') as f:
+                f.write(error_msg)
+            return output_txt_path, api_call_duration
+        client = get_speech_client()
+    except Exception as e:
+        error_msg = f"Error initializing Google Speech client for {audio_file_path}: {e}\n{traceback.format_exc()}"
+        with open(output_txt_path, 'w', encoding='utf-8') as f:
+            f.write(error_msg)
+        return output_txt_path, api_call_duration
+
+    config = get_recognition_config(specific_language_code)
     audio_input = speech.RecognitionAudio(content=content)
 
     full_transcript = ""
@@ -227,7 +258,11 @@ def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
 
     try:
         start_time = time.monotonic()
-        response = client.recognize(config=config, audio=audio_input)
+        if audio_duration_seconds > SYNC_RECOGNIZE_MAX_SECONDS:
+            operation = client.long_running_recognize(config=config, audio=audio_input)
+            response = operation.result(timeout=LONG_RUNNING_TIMEOUT_SECONDS)
+        else:
+            response = client.recognize(config=config, audio=audio_input)
         end_time = time.monotonic()
         api_call_duration = end_time - start_time
 
@@ -251,6 +286,34 @@ def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
             f.write(error_msg)
         return output_txt_path, None
 
+def transcribe_audio_file(task_details: tuple) -> Tuple[str, Optional[float]]:
+    return recognize_audio_content(task_details, prepare_audio_content(task_details))
+
+def produce_prepared_audio(task_queue: queue.Queue, prepared_queue: queue.Queue) -> None:
+    while True:
+        try:
+            task = task_queue.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            prepared_audio = prepare_audio_content(task)
+        except Exception as e:
+            print(f"Error preparing audio for {task[0]}: {e}\n{traceback.format_exc()}")
+            prepared_audio = None
+        prepared_queue.put((task, prepared_audio))
+
+def consume_prepared_audio(prepared_queue: queue.Queue, results_queue: queue.Queue) -> None:
+    while True:
+        prepared = prepared_queue.get()
+        if prepared is None:
+            return
+        task, prepared_audio = prepared
+        try:
+            results_queue.put(recognize_audio_content(task, prepared_audio))
+        except Exception as e:
+            print(f"A task in the pool encountered an error during execution or result retrieval: {e}\n{traceback.format_exc()}")
+            results_queue.put(None)
+
 def collect_audio_files(base_dir: str, video_id_to_lang_map: Dict[str, str]) -> List[Tuple[str, str, str]]:
     tasks: List[Tuple[str, str, str]] = []
     if not os.path.isdir(base_dir):
@@ -261,10 +324,7 @@ def collect_audio_files(base_dir: str, video_id_to_lang_map: Dict[str, str]) ->
         print("Warning: Language metadata map is empty. Files may be skipped if they rely on this map.")
 
     print(f"Scanning for audio files in: {base_dir}")
-    all_files_to_scan = []
-    for root, _, files in os.walk(base_dir):
-        for filename in files:
-            all_files_to_scan.append(os.path.join(root, filename))
+    all_files_to_scan = (os.path.join(root, filename) for root, _, files in os.walk(base_dir) for filename in files)
     
     for audio_file_path in tqdm(all_files_to_scan, desc="Matching files with metadata"):
         file_ext = os.path.splitext(audio_file_path)[1].lower()
@@ -272,7 +332,7 @@ def collect_audio_files(base_dir: str, video_id_to_lang_map: Dict[str, str]) ->
             base_name_from_file = os.path.splitext(os.path.basename(audio_file_path))[0]
             
             extracted_video_id_for_lookup = None
-            match = re.search(r"([a-zA-Z0-9_-]{11})", base_name_from_file)
+            match = VIDEO_ID_REGEX.search(base_name_from_file)
             if match:
                 extracted_video_id_for_lookup = match.group(1)
             
@@ -319,39 +379,61 @@ def pipeline():
 
     print(f"\nFound {len(tasks)} audio files matched with language metadata to process.")
     effective_max_workers = MAX_WORKERS if MAX_WORKERS and MAX_WORKERS > 0 else (os.cpu_count() or 1)
-    print(f"Using up to {effective_max_workers} worker processes.")
+    effective_prep_workers = PREP_WORKERS if PREP_WORKERS and PREP_WORKERS > 0 else 1
+    print(f"Using {effective_prep_workers} audio preparation threads and up to {effective_max_workers} API threads.")
 
     processed_count = 0
-    api_call_durations_list = []
+    durations_recorded = 0
+    duration_csv_path = "google_api_call_durations.csv"
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=effective_max_workers) as executor:
-        futures = [executor.submit(transcribe_audio_file, task) for task in tasks]
-        
-        for future in tqdm(concurrent.futures.as_completed(futures), total=len(tasks), desc="Transcribing audio"):
-            try:
-                output_path, duration = future.result()
-                if duration is not None:
-                    api_call_durations_list.append({'output_path': output_path, 'duration_seconds': duration})
-                else:
-                    api_call_durations_list.append({'output_path': output_path, 'duration_seconds': None})
-                processed_count += 1
-            except Exception as e:
-                print(f"A task in the pool encountered an error during execution or result retrieval: {e}\n{traceback.format_exc()}")
-                processed_count += 1 
+    task_queue: queue.Queue = queue.Queue()
+    for task in tasks:
+        task_queue.put(task)
+    prepared_queue: queue.Queue = queue.Queue(maxsize=PREPARED_AUDIO_QUEUE_SIZE)
+    results_queue: queue.Queue = queue.Queue()
+
+    producers = [
+        threading.Thread(target=produce_prepared_audio, args=(task_queue, prepared_queue), daemon=True)
+        for _ in range(effective_prep_workers)
+    ]
+    for producer in producers:
+        producer.start()
+
+    # Consumers are daemon threads like the producers, so an interrupted result loop never
+    # waits on threads blocked in prepared_queue.get().
+    consumers = [
+        threading.Thread(target=consume_prepared_audio, args=(prepared_queue, results_queue), daemon=True)
+        for _ in range(effective_max_workers)
+    ]
+    for consumer in consumers:
+        consumer.start()
+
+    with open(duration_csv_path, 'w', newline='', encoding='utf-8') as duration_csv_file:
+        duration_writer = csv.writer(duration_csv_file)
+        duration_writer.writerow(['output_path', 'duration_seconds'])
+
+        for _ in tqdm(range(len(tasks)), desc="Transcribing audio"):
+            result = results_queue.get()
+            processed_count += 1
+            if result is None:
+                continue
+            output_path, duration = result
+            duration_writer.writerow([output_path, duration if duration is not None else ''])
+            durations_recorded += 1
+
+    for producer in producers:
+        producer.join()
+    for _ in consumers:
+        prepared_queue.put(None)
+    for consumer in consumers:
+        consumer.join()
                 
     print(f"\n--- Processing Complete ---")
     print(f"Total audio files submitted for processing: {processed_count} (out of {len(tasks)} matched files)")
     print(f"Check individual '.google.txt' files in '{BASE_AUDIO_DIRECTORY}' subdirectories for transcription results or errors.")
 
-    duration_csv_path = "google_api_call_durations.csv"
-    if api_call_durations_list:
-        try:
-            df = pd.DataFrame(api_call_durations_list)
-            df = df.sort_values(by='output_path')
-            df.to_csv(duration_csv_path, index=False, encoding='utf-8')
-            print(f"API call durations successfully saved to: {duration_csv_path}")
-        except Exception as e:
-            print(f"Error saving API call durations to CSV: {e}\n{traceback.format_exc()}")
+    if durations_recorded:
+        print(f"API call durations successfully saved to: {duration_csv_path}")
     else:
         print("No API call durations were recorded to save.")
 